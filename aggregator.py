@@ -0,0 +1,123 @@
+"""
+Concierge Metrics Aggregator - one telemetry shipper for all workers on a host
+Workers set CONCIERGE_METRICS_SOCKET and forward batches here; this process
+needs CONCIERGE_PROJECT_ID and CONCIERGE_AUTH_TOKEN.
+
+    CONCIERGE_METRICS_SOCKET=/tmp/concierge-metrics.sock python -m concierge.aggregator
+"""
+import os
+import sys
+import json
+import asyncio
+
+from concierge.telemetry import (
+    AUTH_TOKEN, FLUSH_BATCH_SIZE, FRAME_HEADER, MAX_FRAME_BYTES, PROJECT_ID, SOCKET_PATH, SPILL_DIR,
+    ConciergeMetrics,
+)
+
+
+class ForwardedEvent:
+    """An event already serialized by a worker; queued as-is."""
+    __slots__ = ("data",)
+
+    def __init__(self, data: dict):
+        self.data = data
+
+    def to_dict(self) -> dict:
+        return self.data
+
+
+class Aggregator:
+    """Receives worker batches on a Unix socket and ships them through one ConciergeMetrics.
+
+    Events are re-batched up to CONCIERGE_METRICS_BATCH_SIZE; aggregate-mode
+    summaries from every worker are merged per (event_type, resource_name)
+    before the next flush.
+    """
+
+    def __init__(self, path: str = SOCKET_PATH):
+        self.path = path
+        # Own spill directory: workers replay SPILL_DIR over the socket, and must not
+        # pick up (and send back) batches the aggregator failed to ship
+        self.metrics = ConciergeMetrics(forward_to=None, spill_dir=os.path.join(SPILL_DIR, "aggregator"))
+        self.frames = 0
+        self._connections: dict[asyncio.StreamWriter, asyncio.Task] = {}
+        self._server: asyncio.AbstractServer | None = None
+
+    @property
+    def workers(self) -> int:
+        return len(self._connections)
+
+    def ingest(self, payload: dict) -> None:
+        queue = self.metrics.queue
+        for event in payload.get("events", ()):
+            if event.get("project_id") is None:
+                event["project_id"] = PROJECT_ID
+            if len(queue) == queue.maxlen:
+                self.metrics.dropped += 1
+            queue.append(ForwardedEvent(event))
+        if payload.get("summaries"):
+            self.metrics.merge_summaries(payload["summaries"])
+        self.frames += 1
+        if len(queue) >= FLUSH_BATCH_SIZE and self.metrics._wakeup is not None:
+            self.metrics._wakeup.set()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._connections[writer] = asyncio.current_task()
+        try:
+            while True:
+                (size,) = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+                if size > MAX_FRAME_BYTES:
+                    break
+                self.ingest(json.loads(await reader.readexactly(size)))
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            self._connections.pop(writer, None)
+            writer.close()
+
+    async def start(self) -> None:
+        if os.path.exists(self.path):
+            os.unlink(self.path)  # stale socket from a previous run
+        self._server = await asyncio.start_unix_server(self._handle, path=self.path)
+        self.metrics.start()
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            # Closing the transport ends each handler's read with EOF; wait for them to finish
+            handlers = list(self._connections.values())
+            for writer in list(self._connections):
+                writer.close()
+            await asyncio.gather(*handlers, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+        await self.metrics.stop()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await self.stop()
+
+
+def main() -> int:
+    if not SOCKET_PATH:
+        print("Set CONCIERGE_METRICS_SOCKET to the socket path workers forward to", file=sys.stderr)
+        return 1
+    if not (PROJECT_ID and AUTH_TOKEN):
+        print("Set CONCIERGE_PROJECT_ID and CONCIERGE_AUTH_TOKEN for the aggregator", file=sys.stderr)
+        return 1
+    print(f"Aggregating telemetry on {SOCKET_PATH}", flush=True)
+    try:
+        asyncio.run(Aggregator().serve_forever())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -18,3 +18,18 @@ class BaseProvider(ABC):
         """Return tool functions to expose on the MCP server."""
         pass
 
+    # Runtime changes are optional so existing providers keep working; the
+    # defaults leave the index as built by index_tools.
+
+    def add_tools(self, tools):
+        """Index additional tools, replacing any with the same name."""
+        pass
+
+    def remove_tools(self, names):
+        """Drop tools from the index by name."""
+        pass
+
+    def update_tool(self, tool):
+        """Re-index a single changed tool."""
+        self.add_tools([tool])
+
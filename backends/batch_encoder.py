@@ -0,0 +1,69 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BatchEncoder:
+    """Encodes queries off the event loop, coalescing concurrent requests.
+
+    Queries arriving within ``max_wait_ms`` of each other are sent to the
+    model as one batch of at most ``max_batch_size`` texts.
+    """
+
+    def __init__(self, get_model, max_batch_size: int = 32, max_wait_ms: float = 2.0):
+        self._get_model = get_model
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self.batches = 0
+        self.queries = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="concierge-encoder")
+        self._pending: list[tuple[str, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+
+    async def encode(self, text: str):
+        return (await self.encode_many([text]))[0]
+
+    async def encode_many(self, texts: list[str]) -> list:
+        """Queue several texts at once so they share a batch."""
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in texts]
+        self._pending.extend(zip(texts, futures))
+        while len(self._pending) >= self.max_batch_size:
+            self._dispatch(loop)
+        if self._pending and self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._dispatch, loop)
+        return list(await asyncio.gather(*futures))
+
+    def _dispatch(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch = self._pending[:self.max_batch_size]
+        self._pending = self._pending[self.max_batch_size:]
+        if self._pending:
+            self._timer = loop.call_later(self.max_wait, self._dispatch, loop)
+        if not batch:
+            return
+
+        texts = list(dict.fromkeys(text for text, _ in batch))
+        self.batches += 1
+        self.queries += len(batch)
+        work = loop.run_in_executor(self._executor, self._encode_batch, texts)
+
+        def resolve(done: asyncio.Future):
+            error = done.exception()
+            rows = None if error else dict(zip(texts, done.result()))
+            for text, future in batch:
+                if future.done():
+                    continue
+                if error:
+                    future.set_exception(error)
+                else:
+                    future.set_result(rows[text])
+
+        work.add_done_callback(resolve)
+
+    def _encode_batch(self, texts: list[str]):
+        return self._get_model().encode(texts, normalize_embeddings=True, batch_size=len(texts))
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
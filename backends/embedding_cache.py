@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+INDEX_FILE = "index.json"
+VECTORS_PATTERN = "embeddings-*.npy"
+PRUNE_AFTER_S = 60.0  # unreferenced vectors files younger than this may belong to an in-flight write
+
+
+def text_key(model_name: str, text: str) -> str:
+    return hashlib.sha256(f"{model_name}\0{text}".encode()).hexdigest()
+
+
+class EmbeddingCache:
+    """Content-addressed on-disk cache of normalized embeddings.
+
+    Vectors live in a memory-mapped ``embeddings-<generation>.npy``;
+    ``index.json`` maps hash(model name, text) to a row and names the
+    vectors file it belongs to. Only texts without a row are encoded.
+    """
+
+    def __init__(self, path: str | os.PathLike, model_name: str):
+        self.model_name = model_name
+        self.dir = Path(path) / re.sub(r"[^A-Za-z0-9_.-]", "_", model_name)
+        self.hits = 0
+        self.misses = 0
+        self._rows: dict[str, int] = {}
+        self._vectors = None
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            index = json.loads((self.dir / INDEX_FILE).read_text())
+            vectors = np.load(self.dir / index["vectors"], mmap_mode="r")
+        except (OSError, ValueError, KeyError, TypeError):
+            return  # Missing, corrupt or superseded cache - rebuild from scratch
+        if index.get("model") != self.model_name or len(index.get("rows", {})) > len(vectors):
+            return
+        self._rows = index["rows"]
+        self._vectors = vectors
+
+    def _persist(self, vectors: np.ndarray) -> None:
+        self.dir.mkdir(parents=True, exist_ok=True)
+        # Each write gets its own vectors file; replacing index.json is the single atomic
+        # step that publishes rows and vectors together, so workers sharing the directory
+        # never pair one writer's rows with another writer's vectors.
+        generation = f"{time.time_ns()}-{os.getpid()}"
+        vectors_name = f"embeddings-{generation}.npy"
+        tmp_vectors = self.dir / f".{vectors_name}.tmp"
+        with open(tmp_vectors, "wb") as f:
+            np.save(f, vectors)
+        os.replace(tmp_vectors, self.dir / vectors_name)
+        self._vectors = np.load(self.dir / vectors_name, mmap_mode="r")
+        tmp_index = self.dir / f".{INDEX_FILE}.{generation}.tmp"
+        tmp_index.write_text(json.dumps({"model": self.model_name, "vectors": vectors_name, "rows": self._rows}))
+        os.replace(tmp_index, self.dir / INDEX_FILE)
+        self._prune(keep=vectors_name)
+
+    def _prune(self, keep: str) -> None:
+        # Older generations are unreferenced; open memory maps survive the unlink.
+        # Recent ones are left alone: another worker may be about to publish one.
+        cutoff = time.time() - PRUNE_AFTER_S
+        for path in self.dir.glob(VECTORS_PATTERN):
+            try:
+                if path.name != keep and path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                pass
+
+    def encode(self, model, texts: list[str]) -> np.ndarray:
+        """Return normalized embeddings for texts, encoding only cache misses."""
+        keys = [text_key(self.model_name, t) for t in texts]
+        with self._lock:
+            missing = {}
+            for key, text in zip(keys, texts):
+                if key not in self._rows:
+                    missing.setdefault(key, text)
+            miss_count = sum(1 for k in keys if k in missing)
+            self.misses += miss_count
+            self.hits += len(keys) - miss_count
+
+            if missing:
+                encoded = np.asarray(
+                    model.encode(list(missing.values()), normalize_embeddings=True),
+                    dtype=np.float32,
+                )
+                start = 0 if self._vectors is None else len(self._vectors)
+                for offset, key in enumerate(missing):
+                    self._rows[key] = start + offset
+                if self._vectors is None:
+                    vectors = encoded
+                else:
+                    vectors = np.concatenate([np.asarray(self._vectors), encoded])
+                self._persist(vectors)
+
+            if not keys:
+                return np.empty((0, 0), dtype=np.float32)
+            return np.asarray(self._vectors[[self._rows[k] for k in keys]])
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._rows),
+        }
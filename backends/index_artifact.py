@@ -0,0 +1,70 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+ARTIFACT_DIR = "concierge_index"
+ARTIFACT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+EMBEDDINGS_FILE = "embeddings.npy"
+
+
+def catalog_hash(names, texts) -> str:
+    """Order-independent hash of the (tool name, search text) pairs."""
+    digest = hashlib.sha256()
+    for name, text in sorted(zip(names, texts)):
+        digest.update(name.encode())
+        digest.update(b"\0")
+        digest.update(text.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def write_index_artifact(directory, names, texts, embeddings, model_name: str) -> Path:
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    tmp = directory / f".{EMBEDDINGS_FILE}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, embeddings)
+    os.replace(tmp, directory / EMBEDDINGS_FILE)
+    manifest = {
+        "version": ARTIFACT_VERSION,
+        "model": model_name,
+        "catalog_hash": catalog_hash(names, texts),
+        "dim": int(embeddings.shape[1]) if embeddings.ndim == 2 else 0,
+        "tools": list(names),
+    }
+    (directory / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2))
+    return directory
+
+
+def load_index_artifact(directory, names, texts, model_name: str):
+    """Memory-map prebuilt embeddings if the artifact matches this catalog and model.
+
+    Returns the embedding rows in the order of ``names``, or None when the
+    artifact is missing or stale.
+    """
+    directory = Path(directory)
+    try:
+        manifest = json.loads((directory / MANIFEST_FILE).read_text())
+    except (OSError, ValueError):
+        return None
+    if (
+        manifest.get("version") != ARTIFACT_VERSION
+        or manifest.get("model") != model_name
+        or manifest.get("catalog_hash") != catalog_hash(names, texts)
+    ):
+        return None
+    try:
+        embeddings = np.load(directory / EMBEDDINGS_FILE, mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+
+    stored = manifest["tools"]
+    if list(names) == stored:
+        return embeddings
+    rows = {name: i for i, name in enumerate(stored)}
+    return np.asarray(embeddings[[rows[n] for n in names]])
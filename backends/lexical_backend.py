@@ -0,0 +1,9 @@
+from concierge.backends.search_backend import SEARCH_LEXICAL, SearchBackend
+
+
+class LexicalBackend(SearchBackend):
+    """BM25-only tool search. Needs no embedding model and indexes in milliseconds."""
+
+    def initialize(self, config):
+        super().initialize(config)
+        self._mode = SEARCH_LEXICAL
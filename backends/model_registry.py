@@ -0,0 +1,126 @@
+import threading
+from dataclasses import dataclass
+
+DEFAULT_MODEL_NAME = "BAAI/bge-large-en-v1.5"
+
+BACKEND_TORCH = "torch"
+BACKEND_ONNX = "onnx"
+BACKEND_OPENVINO = "openvino"
+
+
+@dataclass(frozen=True)
+class ModelOptions:
+    """Runtime settings for loading an embedding model.
+
+    ``backend="onnx"`` with ``file_name="onnx/model_qint8_avx512_vnni.onnx"``
+    (or any int8 export) runs a quantized model on CPU without PyTorch
+    kernels. ``threads`` caps intra-op parallelism and ``max_seq_length``
+    truncates inputs; tool search texts are short, so 128-256 is plenty.
+    """
+    backend: str = BACKEND_TORCH
+    file_name: str | None = None
+    threads: int | None = None
+    max_seq_length: int | None = None
+
+    @classmethod
+    def from_config(cls, config) -> "ModelOptions":
+        return cls(
+            backend=getattr(config, "model_backend", BACKEND_TORCH),
+            file_name=getattr(config, "model_file", None),
+            threads=getattr(config, "model_threads", None),
+            max_seq_length=getattr(config, "max_seq_length", None),
+        )
+
+    def tag(self, name: str) -> str:
+        """Model identity for caches: options that change the vectors are part of it."""
+        parts = [p for p in (
+            None if self.backend == BACKEND_TORCH else self.backend,
+            self.file_name,
+            f"seq{self.max_seq_length}" if self.max_seq_length else None,
+        ) if p]
+        return f"{name}[{','.join(parts)}]" if parts else name
+
+
+DEFAULT_OPTIONS = ModelOptions()
+
+
+def load_model(name: str, device: str | None, options: ModelOptions):
+    from sentence_transformers import SentenceTransformer
+
+    kwargs = {"device": device}
+    model_kwargs = {}
+    if options.backend != BACKEND_TORCH:
+        kwargs["backend"] = options.backend
+    if options.file_name:
+        model_kwargs["file_name"] = options.file_name
+    if options.threads:
+        if options.backend == BACKEND_ONNX:
+            import onnxruntime
+            session_options = onnxruntime.SessionOptions()
+            session_options.intra_op_num_threads = options.threads
+            session_options.inter_op_num_threads = 1
+            model_kwargs["session_options"] = session_options
+        elif options.backend == BACKEND_TORCH:
+            import torch
+            torch.set_num_threads(options.threads)
+    if model_kwargs:
+        kwargs["model_kwargs"] = model_kwargs
+
+    model = SentenceTransformer(name, **kwargs)
+    if options.max_seq_length:
+        model.max_seq_length = options.max_seq_length
+    return model
+
+
+class ModelRegistry:
+    """Process-wide cache of embedding models, loaded on first use.
+
+    Models are keyed by (name, device, options) so every SearchBackend in
+    the process shares one instance per model.
+    """
+
+    def __init__(self):
+        self._models = {}
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def _lock_for(self, key):
+        with self._guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def get(self, name: str = DEFAULT_MODEL_NAME, device: str | None = None,
+            options: ModelOptions = DEFAULT_OPTIONS):
+        key = (name, device, options)
+        model = self._models.get(key)
+        if model is not None:
+            return model
+        with self._lock_for(key):
+            model = self._models.get(key)
+            if model is None:
+                model = load_model(name, device, options)
+                self._models[key] = model
+        return model
+
+    def is_loaded(self, name: str = DEFAULT_MODEL_NAME, device: str | None = None,
+                  options: ModelOptions = DEFAULT_OPTIONS) -> bool:
+        return (name, device, options) in self._models
+
+    def warmup(self, name: str = DEFAULT_MODEL_NAME, device: str | None = None,
+               options: ModelOptions = DEFAULT_OPTIONS):
+        """Load the model and run one forward pass so the first query is not slow."""
+        model = self.get(name, device, options)
+        model.encode("warmup", normalize_embeddings=True)
+        return model
+
+    async def warmup_async(self, name: str = DEFAULT_MODEL_NAME, device: str | None = None,
+                           options: ModelOptions = DEFAULT_OPTIONS):
+        import asyncio
+        return await asyncio.to_thread(self.warmup, name, device, options)
+
+    def clear(self) -> None:
+        with self._guard:
+            self._models.clear()
+            self._locks.clear()
+
+
+registry = ModelRegistry()
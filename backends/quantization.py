@@ -0,0 +1,158 @@
+import hashlib
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+DTYPE_FLOAT32 = "float32"
+DTYPE_FLOAT16 = "float16"
+DTYPE_INT8 = "int8"
+
+MATMUL_BLOCK = 4096
+PRUNE_AFTER_S = 60.0  # stored matrices used more recently than this may be mid-load in another worker
+
+
+class QuantizedMatrix:
+    """Embedding matrix stored as float16, or int8 with a per-row scale.
+
+    Supports the operations the vector indexes use (``len``, row indexing
+    and ``@``), scoring directly on the stored values and applying the row
+    scales afterwards.
+    """
+
+    def __init__(self, data: np.ndarray, scales: np.ndarray | None = None):
+        self.data = data
+        self.scales = scales
+
+    @property
+    def dtype(self) -> str:
+        return str(self.data.dtype)
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, idx):
+        scales = self.scales[idx] if self.scales is not None else None
+        return QuantizedMatrix(self.data[idx], scales)
+
+    def __matmul__(self, other: np.ndarray) -> np.ndarray:
+        other = np.asarray(other, dtype=np.float32)
+        out = np.empty((len(self.data),) + other.shape[1:], dtype=np.float32)
+        # Upcast in row blocks so the float32 temporary stays small
+        for start in range(0, len(self.data), MATMUL_BLOCK):
+            block = np.asarray(self.data[start:start + MATMUL_BLOCK], dtype=np.float32)
+            out[start:start + MATMUL_BLOCK] = block @ other
+        if self.scales is not None:
+            out *= self.scales if other.ndim == 1 else self.scales[:, None]
+        return out
+
+    def __array__(self, dtype=None, copy=None):
+        out = np.asarray(self.data, dtype=np.float32)
+        if self.scales is not None:
+            out = out * self.scales[:, None]
+        return out if dtype is None else out.astype(dtype)
+
+
+def quantize(embeddings: np.ndarray, dtype: str) -> np.ndarray | QuantizedMatrix:
+    """Store embeddings as float32 (unchanged), float16 or int8.
+
+    float16 halves memory but is the slowest to score: NumPy has no fast
+    half-precision matmul, so every query upcasts the whole matrix (about
+    16x float32 latency at 20k x 384). int8 quarters memory at roughly 2x.
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    if dtype == DTYPE_FLOAT32:
+        return embeddings
+    if dtype == DTYPE_FLOAT16:
+        return QuantizedMatrix(embeddings.astype(np.float16))
+    if dtype == DTYPE_INT8:
+        scales = np.abs(embeddings).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        data = np.round(embeddings / scales[:, None]).astype(np.int8)
+        return QuantizedMatrix(data, scales.astype(np.float32))
+    raise ValueError(f"Unknown embedding dtype: {dtype}")
+
+
+def _shared_paths(directory: Path, key: str, dtype: str) -> tuple[Path, Path]:
+    return directory / f"{key}.{dtype}.npy", directory / f"{key}.{dtype}.scales.npy"
+
+
+def store_shared(embeddings: np.ndarray, dtype: str, directory: str | os.PathLike,
+                 key: str | None = None) -> np.ndarray | QuantizedMatrix:
+    """Quantize into a content-addressed file and map it read-only.
+
+    Workers indexing the same catalog resolve to the same file, so the OS
+    shares its pages between them instead of each holding a private copy.
+    ``key`` names the content; without one the full float32 matrix is
+    SHA-256 hashed, which costs about a second per GB.
+    """
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+    directory = Path(directory)
+    if key is None:
+        key = hashlib.sha256(embeddings.tobytes()).hexdigest()[:32]
+    data_path, scales_path = _shared_paths(directory, key, dtype)
+    try:
+        stored = _load_shared(data_path, scales_path, dtype)
+        for path in (data_path, scales_path):
+            if path.exists():
+                os.utime(path)  # in use: keep prune_shared away from it
+        return stored
+    except FileNotFoundError:
+        pass  # not stored yet, or pruned by another worker between our checks
+
+    directory.mkdir(parents=True, exist_ok=True)
+    quantized = quantize(embeddings, dtype)
+    data = quantized.data if isinstance(quantized, QuantizedMatrix) else quantized
+    scales = quantized.scales if isinstance(quantized, QuantizedMatrix) else None
+    # Scales first: data_path existing is the signal that both files are complete
+    if scales is not None:
+        _atomic_save(scales_path, scales)
+    _atomic_save(data_path, data)
+    return _load_shared(data_path, scales_path, dtype)
+
+
+def _load_shared(data_path: Path, scales_path: Path, dtype: str) -> np.ndarray | QuantizedMatrix:
+    data = np.load(data_path, mmap_mode="r")
+    if dtype == DTYPE_FLOAT32:
+        return data
+    scales = np.load(scales_path, mmap_mode="r") if dtype == DTYPE_INT8 else None
+    return QuantizedMatrix(data, scales)
+
+
+def prune_shared(directory: str | os.PathLike, keep: str) -> None:
+    """Delete stored matrices other than ``keep`` that nobody has used for PRUNE_AFTER_S.
+
+    Files are shared between workers, so one still being resolved elsewhere
+    must not vanish; processes that already map a file keep their pages.
+    """
+    cutoff = time.time() - PRUNE_AFTER_S
+    for path in Path(directory).glob("*.npy"):
+        try:
+            if not path.name.startswith(f"{keep}.") and path.stat().st_mtime < cutoff:
+                path.unlink()
+        except OSError:
+            pass
+
+
+def _atomic_save(path: Path, array: np.ndarray) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp, path)
+
+
+def measure_recall(embeddings: np.ndarray, queries: np.ndarray, dtype: str, k: int = 10) -> float:
+    """Mean recall@k of quantized scoring against exact float32 scoring."""
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    queries = np.asarray(queries, dtype=np.float32)
+    quantized = quantize(embeddings, dtype)
+    k = min(k, len(embeddings))
+    reference = np.argsort(-(embeddings @ queries.T), axis=0)[:k]
+    candidate = np.argsort(-(quantized @ queries.T), axis=0)[:k]
+    hits = [len(set(reference[:, q]) & set(candidate[:, q])) for q in range(len(queries))]
+    return float(np.mean(hits)) / k if hits else 1.0
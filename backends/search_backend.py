@@ -1,9 +1,25 @@
+import hashlib
+import threading
+import warnings
 import numpy as np
+from dataclasses import dataclass, field, replace
 from typing import Annotated
 from pydantic import Field
-from sentence_transformers import SentenceTransformer
 from mcp.types import Tool as MCPTool
 from concierge.backends.base_provider import BaseProvider
+from concierge.backends.bm25 import BM25Index
+from concierge.backends.batch_encoder import BatchEncoder
+from concierge.backends.embedding_cache import EmbeddingCache
+from concierge.backends.index_artifact import ARTIFACT_DIR, load_index_artifact
+from concierge.backends.model_registry import DEFAULT_MODEL_NAME, ModelOptions, registry
+from concierge.backends.quantization import DTYPE_FLOAT32, prune_shared, quantize, store_shared
+from concierge.backends.vector_index import IndexSettings, build_vector_index, top_k as top_k_indices
+from concierge.cache import QueryCache, normalize_query
+from concierge.tracing import tracer
+
+SEARCH_VECTOR = "vector"
+SEARCH_HYBRID = "hybrid"
+SEARCH_LEXICAL = "lexical"
 
 
 def to_mcp_tool(tool) -> dict:
@@ -18,7 +34,12 @@ def to_mcp_tool(tool) -> dict:
         _meta=tool.meta,
     ).model_dump(exclude_none=True)
 
-DEFAULT_MODEL = SentenceTransformer("BAAI/bge-large-en-v1.5")
+
+def __getattr__(name):
+    # DEFAULT_MODEL used to be loaded at import time; resolve it lazily instead.
+    if name == "DEFAULT_MODEL":
+        return registry.get(DEFAULT_MODEL_NAME)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 TEXT_FIELDS = ("title", "description", "format")
 LIST_FIELDS = ("examples", "enum")
@@ -62,22 +83,254 @@ def build_search_text(tool) -> str:
     return " ".join(parts)
 
 
+@dataclass(frozen=True)
+class IndexSnapshot:
+    """Immutable view of the index; searches read one snapshot end to end."""
+    tools: tuple
+    embeddings: np.ndarray | None
+    index: object = None
+    generation: int = 0
+    texts: tuple = ()
+    lexical: BM25Index | None = None
+    by_name: dict = field(default_factory=dict)
+    payloads: dict = field(default_factory=dict)  # name -> serialized MCP tool
+    stage_rows: dict = field(default_factory=dict)  # stage -> row indices visible in it
+
+
+EMPTY_SNAPSHOT = IndexSnapshot(tools=(), embeddings=None)
+
+
 class SearchBackend(BaseProvider):
 
     def initialize(self, config):
         self._max_results = config.max_results
-        self._tools = []
-        self._embeddings = None
-        self._model = config.model or DEFAULT_MODEL
+        self._snapshot = EMPTY_SNAPSHOT
+        self._write_lock = threading.Lock()
+        self._index_settings = IndexSettings.from_config(config)
+        self._mode = getattr(config, "search_mode", SEARCH_VECTOR)
+        self._hybrid_alpha = getattr(config, "hybrid_alpha", 0.5)
+        self._embedding_dtype = getattr(config, "embedding_dtype", DTYPE_FLOAT32)
+        self._embedding_store_dir = getattr(config, "embedding_store_dir", None)
+        self._shared_key = None
+        self._stages = {}
+        self._global_tools = frozenset()
+        self._current_stage = None
+        self._model_spec = config.model or DEFAULT_MODEL_NAME
+        self._device = getattr(config, "device", None)
+        self._model_options = ModelOptions.from_config(config)
+        self._query_embeddings = QueryCache(
+            maxsize=getattr(config, "query_cache_size", 1024),
+            ttl=getattr(config, "query_cache_ttl", 300.0),
+        )
+        # Result lists are keyed by snapshot generation, so re-indexing invalidates them
+        self._query_results = QueryCache(
+            maxsize=getattr(config, "query_cache_size", 1024) if getattr(config, "cache_search_results", False) else 0,
+            ttl=getattr(config, "query_cache_ttl", 300.0),
+        )
+        self._encoder = BatchEncoder(
+            lambda: self._model,
+            max_batch_size=getattr(config, "encode_batch_size", 32),
+            max_wait_ms=getattr(config, "encode_max_wait_ms", 2.0),
+        )
+        self._embedding_cache = None
+        cache_dir = getattr(config, "embedding_cache_dir", None)
+        if isinstance(self._model_spec, str):
+            self._model_name = self._model_options.tag(self._model_spec)
+        else:
+            self._model_name = getattr(config, "model_name", None)
+        if cache_dir and self._model_name:
+            self._embedding_cache = EmbeddingCache(cache_dir, self._model_name)
+        elif cache_dir:
+            # A model object has no stable identity to key cached vectors by
+            warnings.warn(
+                "embedding_cache_dir is ignored: Config.model is a loaded model and "
+                "Config.model_name is unset. Set model_name to enable the cache.",
+                stacklevel=2,
+            )
+        self._artifact_dir = getattr(config, "index_artifact", ARTIFACT_DIR)
+
+    @property
+    def _model(self):
+        # Config.model may be a loaded model or a model name resolved through the registry.
+        if isinstance(self._model_spec, str):
+            return registry.get(self._model_spec, self._device, self._model_options)
+        return self._model_spec
+
+    @property
+    def _uses_vectors(self) -> bool:
+        return self._mode != SEARCH_LEXICAL
+
+    @property
+    def ready(self) -> bool:
+        if self._uses_vectors and isinstance(self._model_spec, str):
+            return registry.is_loaded(self._model_spec, self._device, self._model_options)
+        return True
+
+    def warmup(self):
+        """Load the embedding model ahead of the first index or search call."""
+        if self._uses_vectors and isinstance(self._model_spec, str):
+            registry.warmup(self._model_spec, self._device, self._model_options)
 
     def index_tools(self, tools):
-        self._tools = list(tools)
-        texts = [build_search_text(t) for t in self._tools]
-        self._embeddings = self._model.encode(texts, normalize_embeddings=True)
+        tools = tuple(tools)
+        texts = tuple(build_search_text(t) for t in tools)
+        embeddings = None
+        if self._uses_vectors:
+            embeddings = self._load_artifact(tools, texts)
+            if embeddings is None:
+                embeddings = self._encode(texts)
+        with self._write_lock:
+            self._publish(tools, texts, embeddings)
+
+    def _load_artifact(self, tools: tuple, texts: tuple):
+        # Prebuilt by `concierge index`; only used when catalog and model both match
+        if not self._artifact_dir or not self._model_name or not tools:
+            return None
+        return load_index_artifact(self._artifact_dir, [t.name for t in tools], texts, self._model_name)
+
+    def add_tools(self, tools):
+        """Index new tools; tools whose name is already indexed are replaced in place."""
+        tools = list({t.name: t for t in tools}.values())
+        if not tools:
+            return
+        texts = [build_search_text(t) for t in tools]
+        encoded = self._encode(texts) if self._uses_vectors else None
+        with self._write_lock:
+            snap = self._snapshot
+            positions = {t.name: i for i, t in enumerate(snap.tools)}
+            merged, merged_texts = list(snap.tools), list(snap.texts)
+            embeddings = np.array(snap.embeddings) if snap.embeddings is not None else None
+            appended_rows = []
+            for i, tool in enumerate(tools):
+                pos = positions.get(tool.name)
+                if pos is not None:
+                    merged[pos] = tool
+                    merged_texts[pos] = texts[i]
+                    if encoded is not None:
+                        embeddings[pos] = encoded[i]
+                else:
+                    positions[tool.name] = len(merged)
+                    merged.append(tool)
+                    merged_texts.append(texts[i])
+                    if encoded is not None:
+                        appended_rows.append(encoded[i])
+            if appended_rows:
+                rows = np.stack(appended_rows)
+                embeddings = rows if embeddings is None else np.concatenate([embeddings, rows])
+            self._publish(tuple(merged), tuple(merged_texts), embeddings, changed={t.name for t in tools})
+
+    def update_tool(self, tool):
+        self.add_tools([tool])
+
+    def remove_tools(self, names):
+        names = set(names)
+        with self._write_lock:
+            snap = self._snapshot
+            keep = [i for i, t in enumerate(snap.tools) if t.name not in names]
+            if len(keep) == len(snap.tools):
+                return
+            tools = tuple(snap.tools[i] for i in keep)
+            texts = tuple(snap.texts[i] for i in keep)
+            embeddings = snap.embeddings[keep] if tools and snap.embeddings is not None else None
+            self._publish(tools, texts, embeddings, changed=set())
+
+    def set_stages(self, stages: dict, current_stage=None, global_tools=()):
+        """Restrict search to the session's current stage.
+
+        ``stages`` is the ``app.stages`` mapping and ``current_stage`` a
+        callable returning the calling session's stage name. Tools listed in
+        no stage, plus ``global_tools``, are visible in every stage.
+        """
+        with self._write_lock:
+            self._stages = {stage: frozenset(names) for stage, names in (stages or {}).items()}
+            self._global_tools = frozenset(global_tools)
+            self._current_stage = current_stage
+            snap = self._snapshot
+            if snap.tools:
+                self._snapshot = replace(snap, stage_rows=self._stage_rows(snap.tools))
+                self._query_results.clear()
+
+    def _stage_rows(self, tools: tuple) -> dict:
+        if not self._stages:
+            return {}
+        staged = frozenset().union(*self._stages.values())
+        rows = {}
+        for stage, names in self._stages.items():
+            visible = names | self._global_tools
+            rows[stage] = np.array(
+                [i for i, t in enumerate(tools) if t.name in visible or t.name not in staged],
+                dtype=np.intp,
+            )
+        return rows
+
+    def _publish(self, tools: tuple, texts: tuple, embeddings, changed=None):
+        # Callers hold _write_lock; a single attribute swap keeps readers consistent.
+        generation = self._snapshot.generation + 1
+        if not tools:
+            self._snapshot = IndexSnapshot(tools=(), embeddings=None, generation=generation)
+            self._query_results.clear()
+            return
+
+        index = None
+        if embeddings is not None:
+            embeddings = self._store(np.asarray(embeddings), texts)
+            # Incremental updates keep the trained IVF centroids; a full index_tools retrains
+            previous_index = self._snapshot.index if changed is not None else None
+            index = build_vector_index(embeddings, self._index_settings, previous=previous_index)
+        lexical = BM25Index(list(texts)) if self._mode != SEARCH_VECTOR else None
+
+        # Serialize tools once per change; `changed=None` means every tool is new
+        previous = self._snapshot.payloads
+        payloads = {}
+        for tool in tools:
+            if changed is not None and tool.name not in changed and tool.name in previous:
+                payloads[tool.name] = previous[tool.name]
+            else:
+                payloads[tool.name] = to_mcp_tool(tool)
+
+        self._snapshot = IndexSnapshot(
+            tools=tools,
+            embeddings=embeddings,
+            index=index,
+            generation=generation,
+            texts=texts,
+            lexical=lexical,
+            by_name={t.name: t for t in tools},
+            payloads=payloads,
+            stage_rows=self._stage_rows(tools),
+        )
+        self._query_results.clear()
+
+    def _store(self, embeddings: np.ndarray, texts: tuple):
+        if not self._embedding_store_dir:
+            return quantize(embeddings, self._embedding_dtype)
+        # Rows follow the search texts in order, so (model, texts) names the matrix without
+        # hashing every vector; an unnamed model falls back to hashing the matrix itself
+        if self._model_name:
+            digest = hashlib.sha256(self._model_name.encode())
+            for text in texts:
+                digest.update(b"\0" + text.encode())
+        else:
+            digest = hashlib.sha256(np.ascontiguousarray(embeddings, dtype=np.float32).tobytes())
+        key = digest.hexdigest()[:32]
+        stored = store_shared(embeddings, self._embedding_dtype, self._embedding_store_dir, key=key)
+        # Each publish after add/remove/update_tool writes a new file; clear out replaced ones
+        # once no worker has resolved them for a while
+        if self._shared_key is not None and self._shared_key != key:
+            prune_shared(self._embedding_store_dir, keep=key)
+        self._shared_key = key
+        return stored
+
+    def _encode(self, texts):
+        texts = list(texts)
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        if self._embedding_cache is not None:
+            return self._embedding_cache.encode(self._model, texts)
+        return self._model.encode(texts, normalize_embeddings=True)
 
     def serve_tools(self):
         max_k = self._max_results
-        tools_ref = self._tools
 
         class SyntheticTool:
             def __init__(self, name, description, parameters, func):
@@ -94,23 +347,47 @@ class SearchBackend(BaseProvider):
             async def run(self, arguments):
                 return await self._func(**arguments)
 
-        async def search_tools(query: str):
-            results = self._search(query, max_k)
-            return [to_mcp_tool(t) for t in results]
+        async def search_tools(query: str | list[str]):
+            with tracer.span("concierge.search_tools", batch=not isinstance(query, str)):
+                with tracer.span("concierge.stage_check"):
+                    stage = self._current_stage() if self._current_stage else None
+                payloads = self._snapshot.payloads
+                if isinstance(query, str):
+                    results = await self._asearch(query, max_k, stage=stage)
+                    with tracer.span("concierge.serialize"):
+                        return [payloads.get(t.name) or to_mcp_tool(t) for t in results]
+
+                # Batch: per-query tool names, each matched tool's schema listed once
+                per_query = await self._asearch_many(list(query), max_k, stage=stage)
+                with tracer.span("concierge.serialize"):
+                    unique = {t.name: t for results in per_query for t in results}
+                    return {
+                        "results": [
+                            {"query": q, "tools": [t.name for t in results]}
+                            for q, results in zip(query, per_query)
+                        ],
+                        "tools": [payloads.get(name) or to_mcp_tool(t) for name, t in unique.items()],
+                    }
 
         async def call_tool(tool_name: str, arguments: dict):
-            tool = next((t for t in tools_ref if t.name == tool_name), None)
-            if not tool:
-                return {"error": f\"Tool '{tool_name}' not found.\"}
-            return await tool.run(arguments)
+            with tracer.span("concierge.call_tool", tool=tool_name):
+                tool = self._snapshot.by_name.get(tool_name)
+                if not tool:
+                    return {"error": f"Tool '{tool_name}' not found."}
+                self._record_call(tool_name)
+                with tracer.span("concierge.tool", tool=tool_name):
+                    return await tool.run(arguments)
 
         search_params = {
             "type": "object",
             "properties": {
                 "query": {
-                    "type": "string",
-                    "description": "Natural language description of what you want to do. Returns relevant tools you can call with call_tool.",
-                    "examples": ["find user by email", "process payment refund", "lookup order status"],
+                    "anyOf": [
+                        {"type": "string"},
+                        {"type": "array", "items": {"type": "string"}},
+                    ],
+                    "description": "Natural language description of what you want to do, or a list of them to search several steps at once. Returns relevant tools you can call with call_tool.",
+                    "examples": ["find user by email", ["process payment refund", "lookup order status"]],
                 }
             },
             "required": ["query"],
@@ -147,10 +424,145 @@ class SearchBackend(BaseProvider):
             ),
         ]
 
-    def _search(self, query: str, top_k: int):
+    def _record_call(self, tool_name: str) -> None:
+        """Hook for subclasses; called before call_tool dispatches."""
+        pass
+
+    def index_size(self) -> int:
+        return len(self._snapshot.tools)
+
+    def cache_stats(self) -> dict:
+        stats = {
+            "query_embeddings": self._query_embeddings.stats(),
+            "query_results": self._query_results.stats(),
+        }
+        if self._embedding_cache is not None:
+            stats["tool_embeddings"] = self._embedding_cache.stats()
+        return stats
+
+    def close(self):
+        self._encoder.close()
+
+    def _embed_query(self, query: str):
+        key = normalize_query(query)
+        embedding = self._query_embeddings.get(key)
+        if embedding is None:
+            embedding = self._model.encode(key, normalize_embeddings=True)
+            self._query_embeddings.put(key, embedding)
+        return embedding
+
+    async def _aembed_query(self, query: str):
+        key = normalize_query(query)
+        embedding = self._query_embeddings.get(key)
+        if embedding is None:
+            with tracer.span("concierge.search.encode"):
+                embedding = await self._encoder.encode(key)
+            self._query_embeddings.put(key, embedding)
+        return embedding
+
+    def _rank(self, snap: IndexSnapshot, result_key, query: str, query_embedding, top_k: int, stage=None):
+        rows = snap.stage_rows.get(stage) if stage is not None else None
+        if rows is not None:
+            top_indices = self._stage_search(snap, rows, query, query_embedding, top_k)
+        elif self._mode == SEARCH_LEXICAL:
+            scores = snap.lexical.scores(query)
+            top_indices = [i for i in top_k_indices(scores, top_k) if scores[i] > 0]
+        elif self._mode == SEARCH_HYBRID:
+            top_indices = self._hybrid_search(snap, query, query_embedding, top_k)
+        else:
+            top_indices = snap.index.search(query_embedding, top_k)
+        results = [snap.tools[i] for i in top_indices]
+        self._query_results.put(result_key, results)
+        return results
+
+    def _hybrid_search(self, snap: IndexSnapshot, query: str, query_embedding, top_k: int):
+        # Fuse cosine similarity with BM25 scaled to [0, 1] over the union of both candidate lists
+        lexical = snap.lexical.scores(query)
+        peak = lexical.max()
+        if peak > 0:
+            lexical /= peak
+        depth = top_k * 4
+        candidates = np.union1d(snap.index.search(query_embedding, depth), top_k_indices(lexical, depth))
+        alpha = self._hybrid_alpha
+        fused = alpha * (snap.embeddings[candidates] @ query_embedding) + (1 - alpha) * lexical[candidates]
+        return candidates[top_k_indices(fused, top_k)]
+
+    def _stage_search(self, snap: IndexSnapshot, rows: np.ndarray, query: str, query_embedding, top_k: int):
+        # Stages are small, so score their rows exactly instead of going through the ANN index
+        if len(rows) == 0:
+            return []
+        if self._mode == SEARCH_LEXICAL:
+            scores = snap.lexical.scores(query)[rows]
+            return [rows[i] for i in top_k_indices(scores, top_k) if scores[i] > 0]
+        scores = snap.embeddings[rows] @ query_embedding
+        if self._mode == SEARCH_HYBRID:
+            lexical = snap.lexical.scores(query)[rows]
+            peak = lexical.max()
+            if peak > 0:
+                lexical /= peak
+            scores = self._hybrid_alpha * scores + (1 - self._hybrid_alpha) * lexical
+        return rows[top_k_indices(scores, top_k)]
+
+    def _search(self, query: str, top_k: int, stage: str | None = None):
+        snap = self._snapshot
+        if not snap.tools:
+            return []
+
+        result_key = (snap.generation, normalize_query(query), top_k, stage)
+        results = self._query_results.get(result_key)
+        if results is not None:
+            return results
+
+        query_embedding = self._embed_query(query) if self._uses_vectors else None
+        return self._rank(snap, result_key, query, query_embedding, top_k, stage)
+
+    async def _asearch(self, query: str, top_k: int, stage: str | None = None):
+        """Like _search, but encodes on the encoder thread so the event loop stays free."""
+        snap = self._snapshot
+        if not snap.tools:
+            return []
+
+        result_key = (snap.generation, normalize_query(query), top_k, stage)
+        results = self._query_results.get(result_key)
+        if results is not None:
+            return results
+
+        query_embedding = await self._aembed_query(query) if self._uses_vectors else None
+        with tracer.span("concierge.search.rank", mode=self._mode):
+            return self._rank(snap, result_key, query, query_embedding, top_k, stage)
+
+    async def _asearch_many(self, queries: list[str], top_k: int, stage: str | None = None):
+        """Search several queries with one batched encode and one matrix product."""
+        snap = self._snapshot
+        if not snap.tools or not queries:
+            return [[] for _ in queries]
+
+        keys = [(snap.generation, normalize_query(q), top_k, stage) for q in queries]
+        results = [self._query_results.get(key) for key in keys]
+        pending = [i for i, r in enumerate(results) if r is None]
+        if not pending:
+            return results
 
-        query_embedding = self._model.encode(query, normalize_embeddings=True)
-        similarities = self._embeddings @ query_embedding
-        top_indices = np.argsort(similarities)[::-1][:top_k]
+        embeddings = [None] * len(queries)
+        if self._uses_vectors:
+            normalized = [normalize_query(queries[i]) for i in pending]
+            cached = [self._query_embeddings.get(n) for n in normalized]
+            misses = list(dict.fromkeys(n for n, e in zip(normalized, cached) if e is None))
+            encoded = {}
+            if misses:
+                with tracer.span("concierge.search.encode", queries=len(misses)):
+                    encoded = dict(zip(misses, await self._encoder.encode_many(misses)))
+            for n, e in encoded.items():
+                self._query_embeddings.put(n, e)
+            for i, n, e in zip(pending, normalized, cached):
+                embeddings[i] = e if e is not None else encoded[n]
 
-        return [self._tools[i] for i in top_indices]
+        if self._mode == SEARCH_VECTOR and (stage is None or stage not in snap.stage_rows):
+            matrix = np.stack([embeddings[i] for i in pending])
+            for i, top_indices in zip(pending, snap.index.search_many(matrix, top_k)):
+                results[i] = [snap.tools[j] for j in top_indices]
+                self._query_results.put(keys[i], results[i])
+        else:
+            for i in pending:
+                results[i] = self._rank(snap, keys[i], queries[i], embeddings[i], top_k, stage)
+        return results
@@ -0,0 +1,92 @@
+import threading
+from collections import Counter
+
+from concierge.backends.search_backend import SearchBackend
+
+
+class CountedTool:
+    """A hot tool served directly; counts each call so direct use keeps it hot."""
+
+    def __init__(self, tool, record_call):
+        self._tool = tool
+        self._record_call = record_call
+
+    def __getattr__(self, name):
+        return getattr(self._tool, name)
+
+    async def run(self, *args, **kwargs):
+        self._record_call(self._tool.name)
+        return await self._tool.run(*args, **kwargs)
+
+
+class TieredBackend(SearchBackend):
+    """Hot tools listed directly; the long tail behind search_tools/call_tool.
+
+    Hot tools are the configured ``hot_tools`` plus, up to ``max_hot_tools``,
+    the most frequently called tools with at least ``promote_after`` calls.
+    Counts decay by half every ``decay_every`` calls so the set follows
+    shifting traffic.
+    """
+
+    def initialize(self, config):
+        super().initialize(config)
+        self._pinned = tuple(getattr(config, "hot_tools", ()))
+        self._max_hot = getattr(config, "max_hot_tools", 5)
+        self._promote_after = getattr(config, "promote_after", 20)
+        self._decay_every = getattr(config, "decay_every", 10_000)
+        self._counts = Counter()
+        self._calls = 0
+        self._hot = self._pinned
+        self._counts_lock = threading.Lock()
+        # Set by the app to emit tools/list_changed when the hot set moves
+        self.on_hot_tools_change = None
+
+    def hot_tools(self) -> tuple:
+        return self._hot
+
+    def record_call(self, tool_name: str) -> None:
+        """Count a call; call_tool and the hot tools served by serve_tools both report here."""
+        with self._counts_lock:
+            self._counts[tool_name] += 1
+            self._calls += 1
+            decayed = bool(self._decay_every) and self._calls % self._decay_every == 0
+            if decayed:
+                self._counts = Counter({n: c // 2 for n, c in self._counts.items() if c > 1})
+            if not decayed and not self._may_promote(tool_name):
+                return
+            hot = self._rank_hot()
+            changed = hot != self._hot
+            self._hot = hot
+        if changed and self.on_hot_tools_change is not None:
+            self.on_hot_tools_change(hot)
+
+    def _may_promote(self, tool_name: str) -> bool:
+        """Whether this call can change the hot set; keeps the full re-rank off the hot path.
+
+        Calls to tools already hot, or below ``promote_after``, never move
+        the set. Otherwise the tool must fill a free slot or outrank the
+        weakest promoted tool.
+        """
+        count = self._counts[tool_name]
+        if count < self._promote_after or tool_name in self._hot:
+            return False
+        promoted = [n for n in self._hot if n not in self._pinned]
+        if len(promoted) < self._max_hot - len(self._pinned):
+            return True
+        return bool(promoted) and count > min(self._counts[n] for n in promoted)
+
+    def _rank_hot(self) -> tuple:
+        slots = max(0, self._max_hot - len(self._pinned))
+        promoted = [
+            name for name, count in self._counts.most_common()
+            if count >= self._promote_after and name not in self._pinned
+        ][:slots]
+        return self._pinned + tuple(sorted(promoted))
+
+    def _record_call(self, tool_name: str) -> None:
+        self.record_call(tool_name)
+
+    def serve_tools(self):
+        by_name = self._snapshot.by_name
+        hot = [CountedTool(by_name[name], self.record_call) for name in self._hot if name in by_name]
+        return hot + super().serve_tools()
@@ -9,6 +9,19 @@ class VanillaBackend(BaseProvider):
     def index_tools(self, tools):
         self._tools = list(tools)
 
+    def add_tools(self, tools):
+        # Nothing to index; keep the served list in sync
+        tools = list(tools)
+        names = {t.name for t in tools}
+        self._tools[:] = [t for t in self._tools if t.name not in names] + tools
+
+    def remove_tools(self, names):
+        names = set(names)
+        self._tools[:] = [t for t in self._tools if t.name not in names]
+
+    def update_tool(self, tool):
+        self.add_tools([tool])
+
     def serve_tools(self):
         return self._tools
 
@@ -0,0 +1,132 @@
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+ENGINE_AUTO = "auto"
+ENGINE_EXACT = "exact"
+ENGINE_IVF = "ivf"
+
+
+@dataclass(frozen=True)
+class IndexSettings:
+    engine: str = ENGINE_AUTO
+    ann_threshold: int = 20_000   # auto switches to IVF at this many tools
+    nlist: int | None = None      # IVF cells; defaults to ~4*sqrt(N)
+    nprobe: int = 8               # cells scanned per query; higher = better recall, slower
+    train_iterations: int = 10
+
+    @classmethod
+    def from_config(cls, config) -> "IndexSettings":
+        return cls(
+            engine=getattr(config, "index_engine", ENGINE_AUTO),
+            ann_threshold=getattr(config, "ann_threshold", cls.ann_threshold),
+            nlist=getattr(config, "ivf_nlist", None),
+            nprobe=getattr(config, "ivf_nprobe", cls.nprobe),
+        )
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first, without a full sort."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < len(scores):
+        idx = np.argpartition(-scores, k - 1)[:k]
+    else:
+        idx = np.arange(len(scores))
+    return idx[np.argsort(-scores[idx], kind="stable")]
+
+
+class ExactIndex:
+    """Brute-force dot product with argpartition top-k."""
+
+    def __init__(self, embeddings: np.ndarray):
+        self.embeddings = embeddings
+
+    def __len__(self):
+        return len(self.embeddings)
+
+    def search(self, query: np.ndarray, k: int) -> np.ndarray:
+        return top_k(self.embeddings @ query, k)
+
+    def search_many(self, queries: np.ndarray, k: int) -> list[np.ndarray]:
+        # One matrix-matrix product for the whole batch
+        scores = self.embeddings @ np.asarray(queries).T
+        return [top_k(scores[:, q], k) for q in range(scores.shape[1])]
+
+
+class IVFIndex:
+    """Inverted-file index over spherical k-means cells.
+
+    Each query scores only the rows in its ``nprobe`` closest cells.
+    """
+
+    def __init__(self, embeddings: np.ndarray, nlist: int, nprobe: int,
+                 iterations: int = 10, centroids: np.ndarray | None = None, seed: int = 0):
+        self.embeddings = embeddings
+        self.nprobe = nprobe
+        if centroids is None:
+            centroids = self._train(embeddings, nlist, iterations, np.random.default_rng(seed))
+        self.centroids = centroids
+        assignments = self._assign(embeddings, centroids)
+        order = np.argsort(assignments, kind="stable")
+        bounds = np.searchsorted(assignments[order], np.arange(len(centroids) + 1))
+        self._lists = [order[bounds[c]:bounds[c + 1]] for c in range(len(centroids))]
+
+    def __len__(self):
+        return len(self.embeddings)
+
+    @staticmethod
+    def _assign(embeddings, centroids, chunk: int = 8192) -> np.ndarray:
+        out = np.empty(len(embeddings), dtype=np.intp)
+        for start in range(0, len(embeddings), chunk):
+            block = embeddings[start:start + chunk]
+            out[start:start + chunk] = np.argmax(block @ centroids.T, axis=1)
+        return out
+
+    @classmethod
+    def _train(cls, embeddings, nlist, iterations, rng) -> np.ndarray:
+        # Train on a sample; assignment of the full set happens once afterwards
+        sample_size = min(len(embeddings), nlist * 64)
+        sample = embeddings[rng.choice(len(embeddings), sample_size, replace=False)]
+        sample = np.asarray(sample, dtype=np.float32)
+        centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assignments = cls._assign(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            empty = ~sums.any(axis=1)
+            sums[empty] = centroids[empty]
+            centroids = sums / np.linalg.norm(sums, axis=1, keepdims=True)
+        return centroids
+
+    def search(self, query: np.ndarray, k: int) -> np.ndarray:
+        cells = top_k(self.centroids @ query, self.nprobe)
+        candidates = np.concatenate([self._lists[c] for c in cells])
+        if len(candidates) == 0:
+            return candidates
+        scores = self.embeddings[candidates] @ query
+        return candidates[top_k(scores, k)]
+
+    def search_many(self, queries: np.ndarray, k: int) -> list[np.ndarray]:
+        return [self.search(q, k) for q in queries]
+
+
+def build_vector_index(embeddings: np.ndarray, settings: IndexSettings, previous=None):
+    n = len(embeddings)
+    engine = settings.engine
+    if engine == ENGINE_AUTO:
+        engine = ENGINE_IVF if n >= settings.ann_threshold else ENGINE_EXACT
+    if engine == ENGINE_EXACT:
+        return ExactIndex(embeddings)
+    if engine != ENGINE_IVF:
+        raise ValueError(f"Unknown index engine: {settings.engine}")
+
+    nlist = min(settings.nlist or max(1, int(4 * math.sqrt(n))), n)
+    # Reuse trained centroids across incremental updates while the catalog size is stable
+    centroids = None
+    if isinstance(previous, IVFIndex) and len(previous.centroids) == nlist:
+        centroids = previous.centroids
+    return IVFIndex(embeddings, nlist=nlist, nprobe=settings.nprobe,
+                    iterations=settings.train_iterations, centroids=centroids)
@@ -0,0 +1,254 @@
+"""
+Search provider benchmark - recall, build time, query latency and memory
+Runs offline against a stub embedding model and synthetic tool catalogs.
+
+    python benchmarks/search_bench.py --sizes 100 1000 10000 50000 --out bench.json
+
+Pass --model to measure a real embedding runtime instead of the stub, e.g.
+    --model BAAI/bge-small-en-v1.5 --model-backend onnx \
+    --model-file onnx/model_qint8_avx512_vnni.onnx --threads 4 --max-seq-length 128
+"""
+import argparse
+import hashlib
+import json
+import platform
+import random
+import re
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+
+import numpy as np
+
+from concierge.backends.model_registry import ModelOptions, load_model
+from concierge.backends.search_backend import SearchBackend, build_search_text
+
+VERBS = {
+    "get": ["fetch", "retrieve", "look up"],
+    "list": ["show all", "enumerate", "browse"],
+    "create": ["add", "make", "register"],
+    "update": ["change", "modify", "edit"],
+    "delete": ["remove", "erase", "drop"],
+    "search": ["find", "query", "look for"],
+    "cancel": ["abort", "void", "call off"],
+    "refund": ["reimburse", "pay back", "return money for"],
+    "export": ["download", "dump", "extract"],
+    "approve": ["accept", "sign off", "authorize"],
+    "archive": ["shelve", "store away", "retire"],
+    "validate": ["check", "verify", "confirm"],
+}
+DOMAINS = [
+    "billing", "orders", "users", "inventory", "shipping", "payments", "support", "catalog",
+    "analytics", "marketing", "hr", "payroll", "crm", "warehouse", "security", "audit",
+    "notifications", "reports", "compliance", "procurement",
+]
+OBJECTS = [
+    "invoice", "order", "account", "product", "shipment", "payment", "ticket", "coupon",
+    "report", "campaign", "employee", "contract", "vendor", "subscription", "document",
+]
+QUALIFIERS = [
+    "draft", "overdue", "international", "recurring", "priority", "archived", "pending",
+    "enterprise", "trial", "bulk", "regional", "flagged", "scheduled", "partner", "legacy",
+]
+
+
+class StubModel:
+    """Deterministic hashed bag-of-words encoder standing in for a sentence-transformer."""
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+        self._memo = {}
+
+    def _vector(self, text: str) -> np.ndarray:
+        # Memoized so every variant measures indexing, not the stub encoder
+        if text in self._memo:
+            return self._memo[text]
+        vec = np.zeros(self.dim, dtype=np.float32)
+        tokens = re.findall(r"[a-z0-9]+", text.lower())
+        for feature in tokens + [a + " " + b for a, b in zip(tokens, tokens[1:])]:
+            digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dim
+            vec[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = np.linalg.norm(vec)
+        self._memo[text] = vec / norm if norm else vec
+        return self._memo[text]
+
+    def encode(self, texts, normalize_embeddings: bool = True, **kwargs):
+        if isinstance(texts, str):
+            return self._vector(texts)
+        if not texts:
+            return np.empty((0, self.dim), dtype=np.float32)
+        return np.stack([self._vector(t) for t in texts])
+
+
+class BenchTool:
+    def __init__(self, name: str, description: str, parameters: dict):
+        self.name = name
+        self.title = name.replace("_", " ")
+        self.description = description
+        self.parameters = parameters
+        self.output_schema = None
+        self.annotations = None
+        self.icons = None
+        self.meta = None
+
+    async def run(self, arguments):
+        return {}
+
+
+def make_catalog(size: int, num_queries: int, seed: int = 0):
+    """Synthetic tools plus (query, expected tool name) pairs paraphrasing them."""
+    rng = random.Random(seed)
+    combos = [(v, d, o, q) for v in VERBS for d in DOMAINS for o in OBJECTS for q in QUALIFIERS]
+    if size > len(combos):
+        raise ValueError(f"size {size} exceeds {len(combos)} unique synthetic tools")
+    rng.shuffle(combos)
+
+    tools = []
+    for verb, domain, obj, qualifier in combos[:size]:
+        name = f"{verb}_{qualifier}_{domain}_{obj}"
+        description = f"{verb.capitalize()} a {qualifier} {obj} in the {domain} system."
+        parameters = {
+            "type": "object",
+            "properties": {
+                f"{obj}_id": {"type": "string", "description": f"Identifier of the {obj}"},
+                "status": {"type": "string", "enum": [qualifier, "active", "closed"]},
+            },
+        }
+        tools.append(BenchTool(name, description, parameters))
+
+    queries = []
+    for tool in rng.sample(tools, min(num_queries, len(tools))):
+        verb, qualifier, domain, obj = tool.name.split("_", 3)
+        phrase = rng.choice(VERBS[verb])
+        queries.append((f"{phrase} {qualifier} {domain} {obj.replace('_', ' ')}", tool.name))
+    return tools, queries
+
+
+@dataclass
+class Variant:
+    name: str
+    options: dict = field(default_factory=dict)
+
+
+VARIANTS = [
+    Variant("vector-exact", {"search_mode": "vector", "index_engine": "exact"}),
+    Variant("vector-ivf", {"search_mode": "vector", "index_engine": "ivf"}),
+    Variant("vector-int8", {"search_mode": "vector", "index_engine": "exact", "embedding_dtype": "int8"}),
+    Variant("vector-float16", {"search_mode": "vector", "index_engine": "exact", "embedding_dtype": "float16"}),
+    Variant("hybrid", {"search_mode": "hybrid", "index_engine": "exact"}),
+    Variant("lexical", {"search_mode": "lexical"}),
+]
+
+
+def make_backend(variant: Variant, model, k: int) -> SearchBackend:
+    backend = SearchBackend()
+    backend.initialize(SimpleNamespace(max_results=k, model=model, query_cache_size=0, **variant.options))
+    return backend
+
+
+def peak_memory(variant: Variant, tools, queries, model, k: int) -> int:
+    # Separate pass: tracemalloc slows allocations and would skew the latency numbers
+    backend = make_backend(variant, model, k)
+    tracemalloc.start()
+    backend.index_tools(tools)
+    for query, _ in queries[:10]:
+        backend._search(query, k)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    backend.close()
+    return peak
+
+
+def run_variant(variant: Variant, tools, queries, model, k: int) -> dict:
+    backend = make_backend(variant, model, k)
+    start = time.perf_counter()
+    backend.index_tools(tools)
+    build_s = time.perf_counter() - start
+
+    latencies, ranks = [], []
+    for query, expected in queries:
+        start = time.perf_counter()
+        results = backend._search(query, k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        names = [t.name for t in results]
+        ranks.append(names.index(expected) + 1 if expected in names else None)
+    backend.close()
+    peak = peak_memory(variant, tools, queries, model, k)
+
+    found = [r for r in ranks if r is not None]
+    return {
+        "variant": variant.name,
+        "options": variant.options,
+        "size": len(tools),
+        "queries": len(queries),
+        "k": k,
+        "recall@1": sum(1 for r in found if r == 1) / len(ranks),
+        f"recall@{k}": len(found) / len(ranks),
+        "mrr": sum(1 / r for r in found) / len(ranks),
+        "build_s": round(build_s, 4),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 4),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 4),
+        "peak_mb": round(peak / 2**20, 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 50000])
+    parser.add_argument("--variants", nargs="+", default=[v.name for v in VARIANTS])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=5)
+    parser.add_argument("--out", default="bench_output.json")
+    parser.add_argument("--model", help="sentence-transformers model name or local path (default: offline stub)")
+    parser.add_argument("--model-backend", default="torch", choices=["torch", "onnx", "openvino"])
+    parser.add_argument("--model-file", help="model file inside the repo, e.g. an int8 ONNX export")
+    parser.add_argument("--threads", type=int)
+    parser.add_argument("--max-seq-length", type=int)
+    args = parser.parse_args(argv)
+
+    if args.model:
+        options = ModelOptions(
+            backend=args.model_backend,
+            file_name=args.model_file,
+            threads=args.threads,
+            max_seq_length=args.max_seq_length,
+        )
+        model, model_id = load_model(args.model, None, options), options.tag(args.model)
+    else:
+        model, model_id = StubModel(), "stub"
+    variants = [v for v in VARIANTS if v.name in args.variants]
+    results = []
+    for size in args.sizes:
+        tools, queries = make_catalog(size, args.queries)
+        texts = [build_search_text(t) for t in tools]
+        words = [len(t.split()) for t in texts]
+        print(f"{size:>6} search text words p50={np.percentile(words, 50):.0f} p99={np.percentile(words, 99):.0f}")
+        if isinstance(model, StubModel):
+            model.encode(texts + [q for q, _ in queries])
+        for variant in variants:
+            row = run_variant(variant, tools, queries, model, args.k)
+            results.append(row)
+            print(
+                f"{size:>6} {variant.name:<15} recall@{args.k}={row[f'recall@{args.k}']:.3f} "
+                f"mrr={row['mrr']:.3f} build={row['build_s']:.2f}s "
+                f"p50={row['p50_ms']:.2f}ms p99={row['p99_ms']:.2f}ms peak={row['peak_mb']:.1f}MB",
+                flush=True,
+            )
+
+    report = {
+        "model": model_id,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "results": results,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""
+Telemetry microbenchmark - per-call cost of metrics.track and of preparing a flush
+Runs offline; nothing is sent.
+
+    python benchmarks/telemetry_bench.py --events 200000
+"""
+import argparse
+import os
+import sys
+import time
+from dataclasses import asdict
+
+# track() is a no-op unless telemetry is configured
+os.environ.setdefault("CONCIERGE_PROJECT_ID", "bench")
+os.environ.setdefault("CONCIERGE_AUTH_TOKEN", "bench")
+
+from concierge.telemetry import PROJECT_ID, ConciergeMetrics, MCPEvent  # noqa: E402
+
+
+def bench_dataclass(n: int) -> tuple[float, float]:
+    """Reference: one MCPEvent per call with an ISO timestamp, asdict at flush."""
+    queue = []
+    start = time.perf_counter()
+    for i in range(n):
+        queue.append(MCPEvent(
+            project_id=PROJECT_ID, session_id="session", event_type="tool_call",
+            resource_name="search_users", duration_ms=i % 250, is_error=False,
+        ))
+    track_s = time.perf_counter() - start
+    start = time.perf_counter()
+    [asdict(e) for e in queue]
+    return track_s, time.perf_counter() - start
+
+
+def bench_track(n: int) -> tuple[float, float]:
+    m = ConciergeMetrics()
+    m.queue = type(m.queue)(maxlen=n)
+    start = time.perf_counter()
+    for i in range(n):
+        m.track("tool_call", session_id="session", resource_name="search_users",
+                duration_ms=i % 250, is_error=False)
+    track_s = time.perf_counter() - start
+    start = time.perf_counter()
+    m._drain(n)
+    return track_s, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    for name, fn in (("dataclass", bench_dataclass), ("track", bench_track)):
+        track_s, flush_s = min((fn(args.events) for _ in range(args.repeat)), key=lambda r: r[0])
+        print(
+            f"{name:<10} track={track_s / args.events * 1e9:7.0f} ns/event "
+            f"flush-prep={flush_s / args.events * 1e9:7.0f} ns/event",
+            flush=True,
+        )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
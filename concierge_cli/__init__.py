@@ -10,6 +10,7 @@ from pathlib import Path
 API = os.getenv("CONCIERGE_API", "https://getconcierge.app")
 CREDS = Path.home() / ".concierge" / "credentials.json"
 VERSION = "0.3.0"
+INDEX_DIR = "concierge_index"  # same as concierge.backends.index_artifact.ARTIFACT_DIR
 
 # Basic MCP template (non-chatgpt) - Shopping workflow with 3 stages
 TEMPLATE_MAIN = '''"""Shopping workflow with Concierge stages."""
@@ -285,6 +286,8 @@ def deploy(project_path="."):
     
     size = os.path.getsize(tmp_path) / 1024
     print(f"\r  Packaged {dim(f'{size:.1f}KB')} {green('✓')}")
+    if (path / INDEX_DIR).exists():
+        print(f"  {dim('Including prebuilt search index')} {green('✓')}")
     
     # Upload
     print(f"  Uploading...", end="", flush=True)
@@ -406,6 +409,93 @@ def logs(project_id_arg: str = None):
     stream_logs(project_id, api_key)
 
 
+def find_catalog(module):
+    """Find the tool catalog of the app defined in main.py, and its search provider if any"""
+    import inspect
+    from concierge.backends.base_provider import BaseProvider
+    
+    candidates = []
+    for obj in list(vars(module).values()):
+        if inspect.ismodule(obj) or inspect.isclass(obj) or inspect.isroutine(obj):
+            continue
+        candidates += [obj, *getattr(obj, "__dict__", {}).values()]
+    
+    # Prefer the search provider's catalog; the server itself may only list search_tools/call_tool
+    for candidate in candidates:
+        snapshot = getattr(candidate, "_snapshot", None)
+        if isinstance(candidate, BaseProvider) and snapshot is not None and snapshot.tools:
+            return list(snapshot.tools), candidate
+    for candidate in candidates:
+        manager = getattr(candidate, "_tool_manager", None)
+        if manager is not None:
+            return manager.list_tools(), None
+    return None, None
+
+
+def index(project_path=".", model_name=None):
+    """Prebuild the search index so deployed servers skip embedding at startup"""
+    import importlib.util
+    import numpy as np
+    from concierge.backends.index_artifact import write_index_artifact
+    from concierge.backends.model_registry import DEFAULT_MODEL_NAME, registry
+    from concierge.backends.search_backend import build_search_text
+    
+    start = time.time()
+    path = Path(project_path).resolve()
+    main_file = path / "main.py"
+    if not main_file.exists():
+        print(f"\n  {dim('Error:')} main.py not found in {path}\n")
+        sys.exit(1)
+    
+    print(f"\n  {bold('☁  Indexing')} {cyan(path.name)}\n")
+    print(f"  Loading app...", end="", flush=True)
+    sys.path.insert(0, str(path))
+    spec = importlib.util.spec_from_file_location("main", main_file)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    
+    tools, provider = find_catalog(module)
+    if not tools:
+        print(f"\r  {dim('○')} No tools found in main.py\n")
+        sys.exit(1)
+    print(f"\r  Loaded {dim(f'{len(tools)} tools')} {green('✓')}")
+    
+    names = [t.name for t in tools]
+    texts = [build_search_text(t) for t in tools]
+    embeddings = None
+    if provider is not None and hasattr(provider, "_model_name") and not provider._model_name:
+        # A loaded model object has no name to key the artifact by; the server would never load it
+        print(f"\n  {dim('Error:')} main.py passes a loaded model as {bold('Config.model')}; "
+              f"set {bold('Config.model_name')} so the server can match a prebuilt index.\n")
+        sys.exit(1)
+    if provider is not None and getattr(provider, "_model_name", None):
+        # The server looks the artifact up under its own model, so it must be built with that model
+        if model_name and model_name != provider._model_name:
+            print(f"\n  {dim('Error:')} main.py configures {bold(provider._model_name)}; "
+                  f"an index built with {bold(model_name)} would never be loaded. Drop --model.\n")
+            sys.exit(1)
+        model_name = provider._model_name
+        # Importing main.py already indexed the catalog; reuse those vectors unless quantized
+        indexed = provider._snapshot.embeddings
+        if isinstance(indexed, np.ndarray) and indexed.dtype == np.float32 and len(indexed) == len(tools):
+            embeddings = indexed
+        model = provider._model if embeddings is None else None
+    else:
+        model_name = model_name or DEFAULT_MODEL_NAME
+        model = registry.get(model_name)
+    
+    if embeddings is None:
+        print(f"  Embedding with {dim(model_name)}...", end="", flush=True)
+        embeddings = model.encode(texts, normalize_embeddings=True)
+        print(f"\r  Embedded {green('✓')}                                        ")
+    else:
+        print(f"  Reusing embeddings from {dim(model_name)} {green('✓')}")
+    out = write_index_artifact(path / INDEX_DIR, names, texts, embeddings, model_name)
+    
+    print(f"\n  {green('●')} Wrote {bold(out.relative_to(path))}")
+    print(f"  ⚡ {dim(f'Indexed in {time.time() - start:.1f}s')}\n")
+
+
 def init(name="concierge-app", chatgpt=False):
     """Scaffold a new MCP server project"""
     project_dir = Path.cwd() / name
@@ -452,6 +542,7 @@ def main():
     {cyan('deploy')} [path]             Deploy project
     {cyan('deploy')} --logs [path]      Deploy and stream logs
     {cyan('logs')} [project_id]        Stream logs (uses current dir if no id)
+    {cyan('index')} [path]              Prebuild the search index (--model NAME)
     {cyan('login')}                    Authenticate with Concierge
     {cyan('logout')}                   Clear stored credentials
 
@@ -478,6 +569,16 @@ def main():
         result = deploy(path)
         if show_logs and result:
             stream_logs(*result)
+    elif cmd == "index":
+        model_name = None
+        remaining = []
+        rest = iter(args[1:])
+        for a in rest:
+            if a == "--model":
+                model_name = next(rest, None)
+            else:
+                remaining.append(a)
+        index(remaining[0] if remaining else ".", model_name=model_name)
     elif cmd == "logs":
         project_id_arg = args[1] if len(args) > 1 else None
         logs(project_id_arg)
@@ -1,7 +1,11 @@
+import hashlib
+import json
 from dataclasses import dataclass, field
 from enum import Enum, auto
 from typing import Callable, Any
 
+from concierge.cache import QueryCache
+
 
 DEFAULT_ANNOTATIONS = {
     "destructiveHint": False,
@@ -10,6 +14,16 @@ DEFAULT_ANNOTATIONS = {
 }
 
 
+def canonical_args(args: dict | None) -> str:
+    """Stable text form of tool args: key order and whitespace do not matter."""
+    return json.dumps(args or {}, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def content_etag(html: str) -> str:
+    """Strong ETag for rendered HTML."""
+    return '"' + hashlib.sha256(html.encode()).hexdigest()[:32] + '"'
+
+
 class WidgetMode(Enum):
     HTML = auto()        # Inline HTML string
     URL = auto()         # External URL (iframe)
@@ -50,9 +64,23 @@ class Widget:
     invoked: str = "Done"
     widget_accessible: bool = True
     annotations: dict = field(default_factory=lambda: DEFAULT_ANNOTATIONS.copy())
+
+    # Dynamic mode: memoize html_fn output per canonicalized args (opt-in)
+    cache: bool = False
+    cache_size: int = 256
+    cache_ttl: float | None = None  # seconds; None keeps entries until evicted or invalidated
     
-    # Last args from tool call (for dynamic HTML generation)
-    _last_args: dict | None = field(default=None, repr=False)
+    # Tool-call args per session (for dynamic HTML generation), oldest sessions evicted first
+    render_sessions: int = 4096
+    render_session_ttl: float | None = 3600.0
+
+    _session_args: QueryCache = field(init=False, repr=False, compare=False)
+    _renders: QueryCache | None = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._session_args = QueryCache(maxsize=self.render_sessions, ttl=self.render_session_ttl)
+        if self.cache:
+            self._renders = QueryCache(maxsize=self.cache_size, ttl=self.cache_ttl)
     
     @property
     def mode(self) -> WidgetMode:
@@ -74,3 +102,51 @@ class Widget:
             name = self.entrypoint.rsplit(".", 1)[0]
             return f"entrypoints/{name}.html"
         return None
+
+    def remember_args(self, session_id: str, args: dict | None) -> None:
+        """Record a tool call's args for the session whose widget will render next."""
+        self._session_args.put(session_id, args or {})
+
+    def args_for(self, session_id: str) -> dict | None:
+        return self._session_args.get(session_id)
+
+    def render(self, args: dict | None = None, session_id: str | None = None) -> tuple[str, str]:
+        """HTML for this widget and its ETag; dynamic widgets render from ``args``.
+
+        Without ``args``, the args remembered for ``session_id`` are used, so
+        concurrent sessions never see each other's tool calls. With
+        ``cache=True`` repeated args are a cache lookup instead of a call to
+        ``html_fn``.
+        """
+        if self.mode != WidgetMode.DYNAMIC:
+            html = self.html or ""
+            return html, content_etag(html)
+        if args is None and session_id is not None:
+            args = self.args_for(session_id)
+        renders = self._renders
+        key = (self.uri, canonical_args(args))
+        if renders is not None:
+            cached = renders.get(key)
+            if cached is not None:
+                return cached
+        html = self.html_fn(args or {})
+        rendered = (html, content_etag(html))
+        if renders is not None:
+            renders.put(key, rendered)
+        return rendered
+
+    def resource_meta(self, etag: str) -> dict:
+        """Resource ``_meta`` for a rendered widget; clients can skip unchanged content."""
+        return {"concierge/etag": etag}
+
+    def invalidate(self, args: dict | None = None) -> None:
+        """Drop one cached render, or every render of this widget when ``args`` is None."""
+        if self._renders is None:
+            return
+        if args is None:
+            self._renders.clear()
+        else:
+            self._renders.pop((self.uri, canonical_args(args)))
+
+    def cache_stats(self) -> dict | None:
+        return self._renders.stats() if self._renders is not None else None
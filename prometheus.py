@@ -0,0 +1,161 @@
+"""
+Concierge Prometheus endpoint - local /metrics for deployed MCP servers
+Mounted with mount_metrics(http_app); works without CONCIERGE_PROJECT_ID
+"""
+import os
+from bisect import bisect_left
+
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+from concierge.telemetry import metrics
+
+METRICS_PATH = os.getenv("CONCIERGE_METRICS_PATH", "/metrics")
+# Seconds; covers sub-millisecond cache hits through slow tool bodies
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE_TEXT = "text/plain; version=0.0.4; charset=utf-8"
+CONTENT_TYPE_OPENMETRICS = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+class Series:
+    """Counters and latency histogram for one (event_type, resource_name)."""
+    __slots__ = ("count", "errors", "buckets", "sum")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.buckets = [0] * (len(BUCKETS) + 1)  # last slot is +Inf
+        self.sum = 0.0
+
+
+class LocalMetrics:
+    """In-process Prometheus registry fed by metrics.track.
+
+    Nothing here takes a lock: ``observe`` runs on the event loop and only
+    bumps ints on a preallocated Series, and ``render`` reads a copy of the
+    series dict. A scrape racing a write can see a histogram one
+    observation behind its counter, which Prometheus tolerates.
+    """
+
+    def __init__(self):
+        self.series: dict[tuple[str, str | None], Series] = {}
+        self.gauges: dict[str, tuple] = {}
+
+    def observe(self, event_type: str, resource_name: str | None = None,
+                duration_ms: float | None = None, is_error: bool = False) -> None:
+        key = (event_type, resource_name)
+        series = self.series.get(key)
+        if series is None:
+            series = self.series.setdefault(key, Series())
+        series.count += 1
+        if is_error:
+            series.errors += 1
+        if duration_ms is not None:
+            seconds = duration_ms / 1000.0
+            series.buckets[bisect_left(BUCKETS, seconds)] += 1
+            series.sum += seconds
+
+    def gauge(self, name: str, help: str, fn) -> None:
+        """Register a gauge read at scrape time; ``fn`` returns a number or {labels: number}."""
+        self.gauges[name] = (help, fn)
+
+    def render(self, openmetrics: bool = False) -> str:
+        series = list(self.series.items())
+        lines = []
+
+        def family(name, kind, help):
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def counter(name, help, attr):
+            # OpenMetrics names the family without the _total suffix
+            family(name if openmetrics else f"{name}_total", "counter", help)
+            for (event_type, resource), s in series:
+                lines.append(f"{name}_total{_labels(event_type=event_type, resource=resource)} {getattr(s, attr)}")
+
+        counter("concierge_events", "MCP events recorded by metrics.track.", "count")
+        counter("concierge_errors", "MCP events recorded with is_error.", "errors")
+
+        family("concierge_event_duration_seconds", "histogram", "Duration of MCP events.")
+        for (event_type, resource), s in series:
+            counts = list(s.buckets)
+            total, cumulative = sum(counts), 0
+            for bound, n in zip(BUCKETS, counts):
+                cumulative += n
+                labels = _labels(event_type=event_type, resource=resource, le=_number(bound))
+                lines.append(f"concierge_event_duration_seconds_bucket{labels} {cumulative}")
+            labels = _labels(event_type=event_type, resource=resource)
+            inf = _labels(event_type=event_type, resource=resource, le="+Inf")
+            lines.append(f"concierge_event_duration_seconds_bucket{inf} {total}")
+            lines.append(f"concierge_event_duration_seconds_sum{labels} {_number(s.sum)}")
+            lines.append(f"concierge_event_duration_seconds_count{labels} {total}")
+
+        for name, (help, fn) in list(self.gauges.items()):
+            try:
+                value = fn()
+            except Exception:
+                continue
+            family(name, "gauge", help)
+            if isinstance(value, dict):
+                for labels, v in value.items():
+                    lines.append(f"{name}{_labels(**dict(labels))} {_number(v)}")
+            else:
+                lines.append(f"{name} {_number(value)}")
+
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+def _number(value) -> str:
+    if isinstance(value, float):
+        return repr(value) if value == value and abs(value) != float("inf") else str(value)
+    return str(value)
+
+
+def _labels(**labels) -> str:
+    pairs = []
+    for key, value in labels.items():
+        if value is None:
+            continue
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{key}="{escaped}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _active_sessions(session_manager) -> int:
+    return len(getattr(session_manager, "_server_instances", ()))
+
+
+def mount_metrics(http_app, *, backends=(), session_manager=None, path: str = METRICS_PATH) -> LocalMetrics:
+    """Serve Prometheus/OpenMetrics text at ``path`` on the app from streamable_http_app().
+
+        http_app = app.streamable_http_app()
+        mount_metrics(http_app, backends=[search_backend], session_manager=app.session_manager)
+    """
+    local = metrics.local or LocalMetrics()
+    metrics.local = local
+
+    local.gauge("concierge_telemetry_queue_events", "Events waiting for the next telemetry flush.",
+                lambda: len(metrics.queue))
+    local.gauge("concierge_telemetry_dropped_events", "Telemetry events dropped from a full queue or spill.",
+                lambda: metrics.stats()["dropped"])
+    if backends:
+        local.gauge("concierge_search_index_tools", "Tools in the search index.", lambda: {
+            (("provider", type(b).__name__),): b.index_size() for b in backends
+        })
+    if session_manager is not None:
+        local.gauge("concierge_active_sessions", "Open streamable HTTP sessions.",
+                    lambda: _active_sessions(session_manager))
+
+    async def endpoint(request: Request) -> Response:
+        openmetrics = "application/openmetrics-text" in request.headers.get("accept", "")
+        return Response(
+            local.render(openmetrics),
+            media_type=CONTENT_TYPE_OPENMETRICS if openmetrics else CONTENT_TYPE_TEXT,
+        )
+
+    http_app.router.routes.append(Route(path, endpoint, methods=["GET"]))
+    return local
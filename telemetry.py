@@ -3,8 +3,16 @@ Concierge Metrics - Optional telemetry for deployed MCP servers
 Enabled via CONCIERGE_PROJECT_ID and CONCIERGE_AUTH_TOKEN env vars
 """
 import os
+import gzip
+import json
+import math
+import time
+import random
+import struct
 import asyncio
-from dataclasses import dataclass, asdict
+import tempfile
+from pathlib import Path
+from dataclasses import dataclass, field
 from datetime import datetime, UTC
 from collections import deque
 
@@ -14,7 +22,67 @@ import httpx
 PROJECT_ID = os.getenv("CONCIERGE_PROJECT_ID")
 AUTH_TOKEN = os.getenv("CONCIERGE_AUTH_TOKEN")
 API_URL = os.getenv("CONCIERGE_API_URL", "https://getconcierge.app")
-ENABLED = bool(PROJECT_ID and AUTH_TOKEN)
+SOCKET_PATH = os.getenv("CONCIERGE_METRICS_SOCKET")  # forward to a local aggregator instead of the API
+ENABLED = bool(PROJECT_ID and AUTH_TOKEN) or bool(SOCKET_PATH)
+COMPRESSION = os.getenv("CONCIERGE_METRICS_COMPRESSION", "auto")  # auto | zstd | gzip | none
+FLUSH_INTERVAL = float(os.getenv("CONCIERGE_METRICS_FLUSH_INTERVAL", "5.0"))
+FLUSH_BATCH_SIZE = int(os.getenv("CONCIERGE_METRICS_BATCH_SIZE", "500"))
+QUEUE_SIZE = int(os.getenv("CONCIERGE_METRICS_QUEUE_SIZE", "10000"))
+SPILL_DIR = os.getenv("CONCIERGE_METRICS_SPILL_DIR", os.path.join(tempfile.gettempdir(), "concierge-metrics"))
+SPILL_MAX_BYTES = int(os.getenv("CONCIERGE_METRICS_SPILL_MAX_BYTES", str(16 * 1024 * 1024)))
+MODE_EVENTS = "events"
+MODE_AGGREGATE = "aggregate"
+MODE = os.getenv("CONCIERGE_METRICS_MODE", MODE_EVENTS)
+ERROR_SAMPLES = int(os.getenv("CONCIERGE_METRICS_ERROR_SAMPLES", "20"))  # raw error events kept per key per interval
+SAMPLE_RATE = float(os.getenv("CONCIERGE_METRICS_SAMPLE_RATE", "1.0"))
+SAMPLE_RATES = os.getenv("CONCIERGE_METRICS_SAMPLE_RATES", "")  # per event type, e.g. "tool_call=0.1,resource_read=0.5"
+SLOW_MS = float(os.getenv("CONCIERGE_METRICS_SLOW_MS", "0"))  # always keep events at least this slow; 0 disables
+
+
+# _send outcomes: delivered, worth retrying later, or refused by the collector for good
+SEND_OK = "ok"
+SEND_RETRY = "retry"
+SEND_REJECTED = "rejected"
+
+FRAME_HEADER = struct.Struct("!I")  # aggregator frames: 4-byte length, then a JSON payload
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+
+
+def parse_sample_rates(spec: str) -> dict[str, float]:
+    rates = {}
+    for item in spec.split(","):
+        name, sep, rate = item.partition("=")
+        if sep and name.strip():
+            rates[name.strip()] = min(1.0, max(0.0, float(rate)))
+    return rates
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _zstd_compressor():
+    try:
+        import zstandard
+        return zstandard.ZstdCompressor(level=3)
+    except ImportError:
+        return None
+
+
+def encode_body(payload: dict, compression: str = COMPRESSION) -> tuple[bytes, dict]:
+    """Serialize and compress a request body; returns (body, extra headers)."""
+    body = json.dumps(payload, separators=(",", ":")).encode()
+    if compression in ("auto", "zstd"):
+        compressor = _zstd_compressor()
+        if compressor is not None:
+            return compressor.compress(body), {"Content-Encoding": "zstd"}
+    if compression in ("auto", "zstd", "gzip"):
+        return gzip.compress(body, compresslevel=5), {"Content-Encoding": "gzip"}
+    return body, {}
 
 
 @dataclass
@@ -33,43 +101,481 @@ class MCPEvent:
             self.timestamp = datetime.now(UTC).isoformat()
 
 
+class EventRecord:
+    """Queued event; MCPEvent's wire shape is only built at flush time.
+
+    Holds the epoch timestamp as a float so ``track`` does no datetime
+    formatting and allocates one slotted object per call.
+    """
+    __slots__ = ("session_id", "event_type", "resource_name", "duration_ms",
+                 "is_error", "error_message", "timestamp", "sample_weight")
+
+    def __init__(self, session_id, event_type, resource_name, duration_ms, is_error, error_message,
+                 timestamp, sample_weight=1.0):
+        self.session_id = session_id
+        self.event_type = event_type
+        self.resource_name = resource_name
+        self.duration_ms = duration_ms
+        self.is_error = is_error
+        self.error_message = error_message
+        self.timestamp = timestamp
+        self.sample_weight = sample_weight
+
+    def to_dict(self) -> dict:
+        return {
+            "project_id": PROJECT_ID,
+            "session_id": self.session_id,
+            "event_type": self.event_type,
+            "resource_name": self.resource_name,
+            "duration_ms": self.duration_ms,
+            "is_error": self.is_error,
+            "error_message": self.error_message,
+            "timestamp": datetime.fromtimestamp(self.timestamp, UTC).isoformat(),
+            "sample_weight": self.sample_weight,
+        }
+
+
+class LatencySketch:
+    """Mergeable latency histogram with relative-error buckets (DDSketch style).
+
+    Values land in logarithmic buckets of width ``gamma``, so any quantile
+    is accurate to within ``relative_accuracy``. Two sketches with the same
+    accuracy merge by adding bucket counts.
+    """
+    __slots__ = ("relative_accuracy", "_log_gamma", "bins", "zero", "count", "sum", "min", "max")
+
+    def __init__(self, relative_accuracy: float = 0.02):
+        self.relative_accuracy = relative_accuracy
+        self._log_gamma = math.log((1 + relative_accuracy) / (1 - relative_accuracy))
+        self.bins: dict[int, int] = {}
+        self.zero = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if value <= 0:
+            self.zero += 1
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        self.bins[key] = self.bins.get(key, 0) + 1
+
+    def merge(self, other: "LatencySketch") -> None:
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.zero += other.zero
+        for key, n in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + n
+
+    def quantile(self, q: float) -> float | None:
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                # Bucket midpoint in log space keeps the relative error bound
+                return 2 * math.exp(key * self._log_gamma) / (1 + math.exp(self._log_gamma))
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "zero": self.zero,
+            "bins": {str(k): n for k, n in self.bins.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LatencySketch":
+        sketch = cls(data["relative_accuracy"])
+        sketch.count = data["count"]
+        sketch.sum = data["sum"]
+        sketch.min = data["min"] if data["min"] is not None else math.inf
+        sketch.max = data["max"] if data["max"] is not None else -math.inf
+        sketch.zero = data["zero"]
+        sketch.bins = {int(k): n for k, n in data["bins"].items()}
+        return sketch
+
+
+@dataclass
+class ResourceStats:
+    """Per (event_type, resource_name) totals for one aggregation interval."""
+    count: int = 0
+    errors: int = 0
+    error_samples: int = 0
+    latency: LatencySketch = field(default_factory=LatencySketch)
+
+    def merge(self, other: "ResourceStats") -> None:
+        self.count += other.count
+        self.errors += other.errors
+        self.latency.merge(other.latency)
+
+
+class SpillBuffer:
+    """Bounded on-disk NDJSON segments holding batches the collector did not accept.
+
+    When the total size exceeds ``max_bytes`` the oldest segments are
+    deleted and their events counted as dropped. Methods do blocking file
+    I/O; ConciergeMetrics calls them through ``asyncio.to_thread``.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.dir = Path(directory)
+        self.max_bytes = max_bytes
+        self.dropped = 0
+
+    def _segments(self, pattern: str = "segment-*.ndjson") -> list[Path]:
+        try:
+            return sorted(self.dir.glob(pattern))
+        except OSError:
+            return []
+
+    def recover(self) -> int:
+        """Return segments claimed by workers that are no longer running to the replay pool."""
+        recovered = 0
+        for path in self._segments("segment-*.claimed-*"):
+            pid = path.suffix.rsplit("-", 1)[-1]
+            if pid.isdigit() and int(pid) != os.getpid() and _pid_alive(int(pid)):
+                continue
+            try:
+                os.rename(path, path.with_suffix(".ndjson"))
+                recovered += 1
+            except OSError:
+                continue
+        return recovered
+
+    def write(self, events: list[dict]) -> bool:
+        try:
+            self.dir.mkdir(parents=True, exist_ok=True)
+            path = self.dir / f"segment-{time.time_ns()}-{os.getpid()}.ndjson"
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text("".join(json.dumps(e, separators=(",", ":")) + "\n" for e in events))
+            os.replace(tmp, path)
+        except OSError:
+            return False
+        self._enforce_limit()
+        return True
+
+    def _enforce_limit(self) -> None:
+        # Claimed segments count toward the limit but are only deleted by their claimer
+        total = sum(_size(p) for p in self._segments("segment-*.claimed-*"))
+        segments = self._segments()
+        sizes = [_size(p) for p in segments]
+        total += sum(sizes)
+        for path, size in zip(segments, sizes):
+            if total <= self.max_bytes:
+                break
+            try:
+                self.dropped += sum(1 for _ in path.open())
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+
+    def claim(self) -> tuple[Path, list[dict]] | None:
+        """Take the oldest segment; renaming first keeps two workers from replaying it."""
+        for path in self._segments():
+            claimed = path.with_suffix(f".claimed-{os.getpid()}")
+            try:
+                os.rename(path, claimed)
+                return claimed, [json.loads(line) for line in claimed.read_text().splitlines() if line]
+            except (OSError, ValueError):
+                continue
+        return None
+
+    def release(self, claimed: Path, delivered: bool) -> None:
+        try:
+            if delivered:
+                claimed.unlink()
+            else:
+                os.rename(claimed, claimed.with_suffix(".ndjson"))
+        except OSError:
+            pass
+
+
+def _size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
 class ConciergeMetrics:
-    def __init__(self):
-        self.queue: deque[MCPEvent] = deque(maxlen=1000)
+    """Per-process event queue and flush loop.
+
+    With ``forward_to`` (CONCIERGE_METRICS_SOCKET) batches go to a local
+    aggregator over a Unix socket instead of the API; the aggregator merges
+    them across workers and ships one stream over one connection.
+    """
+
+    def __init__(self, forward_to: str | None = SOCKET_PATH, spill_dir: str | None = None):
+        self.forward_to = forward_to
+        self._writer: asyncio.StreamWriter | None = None
+        self.queue: deque[EventRecord] = deque(maxlen=QUEUE_SIZE)
         self._task: asyncio.Task | None = None
         self._running = False
+        self._client: httpx.AsyncClient | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._spill = SpillBuffer(spill_dir or SPILL_DIR, SPILL_MAX_BYTES)
+        self._retry_at = 0.0
+        self._backoff = FLUSH_INTERVAL
+        self.aggregates: dict[tuple[str, str | None], ResourceStats] = {}
+        self.local = None    # prometheus.LocalMetrics once /metrics is mounted
+        self.sample_rates = parse_sample_rates(SAMPLE_RATES)
+        self.slow_ms = SLOW_MS
+        # Counters
+        self.sent = 0
+        self.dropped = 0     # evicted from a full queue
+        self.failed = 0      # batches the collector rejected or never received
+        self.spilled = 0
+        self.replayed = 0
+        self.rejected = 0    # refused by the collector (4xx other than 429); not retried
+        self.sampled_out = 0
+        self._recovered = False
+
+    def stats(self) -> dict:
+        return {
+            "queued": len(self.queue),
+            "sent": self.sent,
+            "dropped": self.dropped + self._spill.dropped,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "spilled": self.spilled,
+            "replayed": self.replayed,
+            "sampled_out": self.sampled_out,
+        }
 
-    def track(self, event_type: str, **kwargs) -> None:
+    def _get_client(self) -> httpx.AsyncClient:
+        # One pooled keep-alive client per process instead of a new connection per flush
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=5.0,
+                http2=_http2_available(),
+                limits=httpx.Limits(max_connections=2, max_keepalive_connections=2, keepalive_expiry=60.0),
+                headers={"Authorization": f"Bearer {AUTH_TOKEN}", "Content-Type": "application/json"},
+            )
+        return self._client
+
+    def track(self, event_type: str, session_id: str = "unknown", resource_name: str | None = None,
+              duration_ms: float | None = None, is_error: bool = False, error_message: str | None = None) -> None:
+        if self.local is not None:
+            self.local.observe(event_type, resource_name, duration_ms, is_error)
         if not ENABLED:
             return
-        self.queue.append(MCPEvent(
-            project_id=PROJECT_ID,
-            session_id=kwargs.pop("session_id", "unknown"),
-            event_type=event_type,
-            **kwargs
-        ))
-
-    async def flush(self) -> None:
-        if not ENABLED or not self.queue:
+        if MODE == MODE_AGGREGATE and not self._aggregate(event_type, resource_name, duration_ms, is_error):
             return
-        events = [asdict(self.queue.popleft()) for _ in range(len(self.queue))]
-        if not events:
+        weight = self._sample_weight(event_type, duration_ms, is_error)
+        if not weight:
+            self.sampled_out += 1
             return
+        queue = self.queue
+        if len(queue) == queue.maxlen:
+            self.dropped += 1
+        queue.append(EventRecord(session_id, event_type, resource_name, duration_ms,
+                                 is_error, error_message, time.time(), weight))
+        # Size trigger: wake the flush loop instead of waiting out the interval
+        if len(self.queue) >= FLUSH_BATCH_SIZE and self._wakeup is not None:
+            self._wakeup.set()
+
+    def _sample_weight(self, event_type: str, duration_ms: float | None, is_error: bool) -> float:
+        """Weight to ship the event with, or 0.0 to drop it.
+
+        Errors and calls slower than ``slow_ms`` are always kept at weight 1;
+        the rest are head-sampled per event type and carry 1/rate so the
+        backend can rescale counts.
+        """
+        if is_error or (self.slow_ms and duration_ms is not None and duration_ms >= self.slow_ms):
+            return 1.0
+        rate = self.sample_rates.get(event_type, SAMPLE_RATE)
+        if rate >= 1.0:
+            return 1.0
+        if rate <= 0.0 or random.random() >= rate:
+            return 0.0
+        return 1.0 / rate
+
+    def _aggregate(self, event_type: str, resource_name: str | None,
+                   duration_ms: float | None, is_error: bool) -> bool:
+        """Fold an event into its summary; returns True if the raw event should be kept too."""
+        key = (event_type, resource_name)
+        stats = self.aggregates.get(key)
+        if stats is None:
+            stats = self.aggregates[key] = ResourceStats()
+        stats.count += 1
+        if duration_ms is not None:
+            stats.latency.add(duration_ms)
+        if not is_error:
+            return False
+        stats.errors += 1
+        stats.error_samples += 1
+        return stats.error_samples <= ERROR_SAMPLES
+
+    def _drain_summaries(self) -> list[dict]:
+        aggregates, self.aggregates = self.aggregates, {}
+        summaries = []
+        for (event_type, resource_name), stats in aggregates.items():
+            summaries.append({
+                "project_id": PROJECT_ID,
+                "event_type": event_type,
+                "resource_name": resource_name,
+                "count": stats.count,
+                "errors": stats.errors,
+                "p50_ms": stats.latency.quantile(0.5),
+                "p90_ms": stats.latency.quantile(0.9),
+                "p99_ms": stats.latency.quantile(0.99),
+                "latency": stats.latency.to_dict(),
+            })
+        return summaries
+
+    def merge_summaries(self, summaries: list[dict]) -> None:
+        """Fold summaries into the current interval: unsent ones, or another worker's."""
+        for summary in summaries:
+            key = (summary["event_type"], summary["resource_name"])
+            restored = ResourceStats(
+                count=summary["count"],
+                errors=summary["errors"],
+                latency=LatencySketch.from_dict(summary["latency"]),
+            )
+            if key in self.aggregates:
+                restored.merge(self.aggregates[key])
+                restored.error_samples = self.aggregates[key].error_samples
+            self.aggregates[key] = restored
+
+    async def flush_summaries(self) -> None:
+        # While backing off, summaries keep accumulating in place
+        if not ENABLED or not self.aggregates or time.monotonic() < self._retry_at:
+            return
+        summaries = self._drain_summaries()
+        outcome = await self._send([], summaries=summaries)
+        self._schedule_retry(success=outcome != SEND_RETRY)
+        if outcome == SEND_RETRY:
+            self.merge_summaries(summaries)
+        elif outcome == SEND_REJECTED:
+            self.rejected += sum(s["count"] for s in summaries)
+
+    async def _send(self, events: list[dict], summaries: list[dict] | None = None) -> str:
+        payload = {"events": events}
+        if summaries:
+            payload["summaries"] = summaries
+        if self.forward_to:
+            return await self._forward(payload)
+        body, headers = encode_body(payload)
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                await client.post(
-                    f"{API_URL}/analytics/events",
-                    json={"events": events},
-                    headers={"Authorization": f"Bearer {AUTH_TOKEN}"}
-                )
+            r = await self._get_client().post(f"{API_URL}/analytics/events", content=body, headers=headers)
         except Exception:
-            pass  # Best effort - drop on failure
+            return SEND_RETRY
+        if r.status_code < 400:
+            return SEND_OK
+        # Client errors will not succeed on retry either; only server/transport failures are spilled
+        return SEND_RETRY if r.status_code >= 500 or r.status_code == 429 else SEND_REJECTED
+
+    async def _forward(self, payload: dict) -> str:
+        body = json.dumps(payload, separators=(",", ":")).encode()
+        try:
+            if self._writer is None or self._writer.is_closing():
+                _, self._writer = await asyncio.open_unix_connection(self.forward_to)
+            self._writer.write(FRAME_HEADER.pack(len(body)) + body)
+            await self._writer.drain()
+            return SEND_OK
+        except (OSError, ConnectionError):
+            # Aggregator down: drop the connection; flush spills and retries with backoff
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            return SEND_RETRY
+
+    def _drain(self, count: int) -> list[dict]:
+        popleft = self.queue.popleft
+        return [popleft().to_dict() for _ in range(count)]
+
+    async def flush(self) -> None:
+        if not ENABLED or not self.queue:
+            return
+        while self.queue:
+            count = min(len(self.queue), FLUSH_BATCH_SIZE)
+            events = self._drain(count)
+            # While backing off, spill straight to disk rather than waiting on a dead collector;
+            # only a real send attempt moves the backoff
+            if time.monotonic() >= self._retry_at:
+                outcome = await self._send(events)
+                self._schedule_retry(success=outcome != SEND_RETRY)
+                if outcome == SEND_OK:
+                    self.sent += len(events)
+                    continue
+                if outcome == SEND_REJECTED:
+                    self.rejected += len(events)
+                    continue
+            self.failed += len(events)
+            if await asyncio.to_thread(self._spill.write, events):
+                self.spilled += len(events)
+            else:
+                self.dropped += len(events)
+
+    def _schedule_retry(self, success: bool) -> None:
+        if success:
+            self._backoff = FLUSH_INTERVAL
+            self._retry_at = 0.0
+        else:
+            self._retry_at = time.monotonic() + self._backoff
+            self._backoff = min(self._backoff * 2, 300.0)
+
+    async def replay(self) -> None:
+        """Resend spilled segments, backing off exponentially while the collector is down."""
+        if not self._recovered:
+            self._recovered = True
+            await asyncio.to_thread(self._spill.recover)
+        while time.monotonic() >= self._retry_at:
+            segment = await asyncio.to_thread(self._spill.claim)
+            if segment is None:
+                return
+            path, events = segment
+            outcome = await self._send(events) if events else SEND_OK
+            # A rejected segment would be rejected again; release it like a delivered one
+            await asyncio.to_thread(self._spill.release, path, outcome != SEND_RETRY)
+            if events:
+                self._schedule_retry(success=outcome != SEND_RETRY)
+            if outcome == SEND_RETRY:
+                return
+            if outcome == SEND_REJECTED:
+                self.rejected += len(events)
+            else:
+                self.replayed += len(events)
 
     async def _loop(self) -> None:
+        self._wakeup = asyncio.Event()
         while self._running:
-            await asyncio.sleep(5.0)
             try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush_summaries()
                 await self.flush()
+                await self.replay()
             except Exception:
                 pass
 
@@ -99,7 +605,14 @@ class ConciergeMetrics:
         self._running = False
         if self._task:
             self._task.cancel()
+        await self.flush_summaries()
         await self.flush()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
 
 
 # Singleton
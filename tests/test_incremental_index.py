@@ -0,0 +1,101 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from benchmarks.search_bench import BenchTool, StubModel, make_catalog
+from concierge.backends.search_backend import SearchBackend, build_search_text
+
+
+def make_backend(model, **options):
+    backend = SearchBackend()
+    backend.initialize(SimpleNamespace(max_results=3, model=model, query_cache_size=0, **options))
+    return backend
+
+
+def tool(name, description):
+    return BenchTool(name, description, {"type": "object", "properties": {}})
+
+
+def assert_aligned(backend, model):
+    snap = backend._snapshot
+    assert len(snap.tools) == len(snap.texts) == len(snap.embeddings)
+    assert [build_search_text(t) for t in snap.tools] == list(snap.texts)
+    np.testing.assert_allclose(np.asarray(snap.embeddings), model.encode(list(snap.texts)), atol=1e-6)
+    assert list(snap.payloads) == [t.name for t in snap.tools]
+    assert all(snap.payloads[t.name]["description"] == t.description for t in snap.tools)
+    assert all(snap.by_name[t.name] is t for t in snap.tools)
+
+
+def test_add_appends_new_tools():
+    model = StubModel(64)
+    tools, _ = make_catalog(20, 0)
+    backend = make_backend(model)
+    backend.index_tools(tools[:15])
+    backend.add_tools(tools[15:])
+
+    assert [t.name for t in backend._snapshot.tools] == [t.name for t in tools]
+    assert_aligned(backend, model)
+
+
+def test_add_replaces_same_name_in_place():
+    model = StubModel(64)
+    tools, _ = make_catalog(10, 0)
+    backend = make_backend(model)
+    backend.index_tools(tools)
+    before = backend._snapshot
+    changed = tool(tools[3].name, "Send a postcard to the moon.")
+    backend.update_tool(changed)
+
+    snap = backend._snapshot
+    assert snap.tools[3] is changed
+    assert [t.name for t in snap.tools] == [t.name for t in tools]
+    assert_aligned(backend, model)
+    # Unchanged tools keep their serialized payloads; the old snapshot is untouched
+    assert snap.payloads[tools[0].name] is before.payloads[tools[0].name]
+    assert before.tools[3] is tools[3]
+    assert before.texts[3] == build_search_text(tools[3])
+    assert backend._search("postcard moon", 1) == [changed]
+
+
+def test_remove_keeps_rows_aligned():
+    model = StubModel(64)
+    tools, _ = make_catalog(12, 0)
+    backend = make_backend(model)
+    backend.index_tools(tools)
+    backend.remove_tools([tools[0].name, tools[5].name, tools[11].name, "not_indexed"])
+
+    remaining = [t for i, t in enumerate(tools) if i not in (0, 5, 11)]
+    assert list(backend._snapshot.tools) == remaining
+    assert_aligned(backend, model)
+
+
+def test_stage_rows_follow_changes():
+    model = StubModel(64)
+    tools, _ = make_catalog(8, 0)
+    backend = make_backend(model)
+    backend.index_tools(tools)
+    backend.set_stages({"browse": [tools[1].name, tools[6].name], "checkout": [tools[2].name]})
+    backend.remove_tools([tools[1].name])
+    backend.add_tools([tool("checkout_extra", "Extra checkout step.")])
+
+    snap = backend._snapshot
+    unstaged = {t.name for i, t in enumerate(tools) if i not in (1, 2, 6)} | {"checkout_extra"}
+    for stage, staged in {"browse": {tools[6].name}, "checkout": {tools[2].name}}.items():
+        assert {snap.tools[i].name for i in snap.stage_rows[stage]} == unstaged | staged
+
+
+def test_empty_then_readd():
+    model = StubModel(64)
+    tools, _ = make_catalog(5, 0)
+    backend = make_backend(model)
+    backend.index_tools(tools)
+    backend.remove_tools([t.name for t in tools])
+
+    assert backend._snapshot.tools == ()
+    assert backend._snapshot.embeddings is None
+    assert backend._search("anything", 3) == []
+
+    backend.add_tools(tools[:2])
+    assert list(backend._snapshot.tools) == tools[:2]
+    assert_aligned(backend, model)
+    assert backend._search(build_search_text(tools[1]), 1) == [tools[1]]
@@ -0,0 +1,198 @@
+import asyncio
+import gzip
+import json
+from http import HTTPStatus
+
+import pytest
+import pytest_asyncio
+
+import concierge.telemetry as telemetry
+
+
+class StandInCollector:
+    """Minimal keep-alive HTTP/1.1 server that records connections and request bodies."""
+
+    def __init__(self):
+        self.status = 200
+        self.connections = 0
+        self.requests = []  # (headers, wire body, decoded payload)
+        self._server = None
+
+    async def start(self) -> str:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return f"http://127.0.0.1:{self._server.sockets[0].getsockname()[1]}"
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                lines = head.decode().split("\r\n")
+                headers = {k.lower(): v.strip() for k, _, v in (l.partition(":") for l in lines[1:] if ":" in l)}
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                self.requests.append((headers, body, json.loads(self._decode(headers, body))))
+                status = f"HTTP/1.1 {self.status} {HTTPStatus(self.status).phrase}\r\n"
+                writer.write(status.encode() + b"Content-Length: 2\r\nContent-Type: application/json\r\n\r\n{}")
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _decode(headers, body) -> bytes:
+        encoding = headers.get("content-encoding")
+        if encoding == "gzip":
+            return gzip.decompress(body)
+        if encoding == "zstd":
+            import zstandard
+            return zstandard.ZstdDecompressor().decompress(body)
+        return body
+
+
+@pytest_asyncio.fixture
+async def collector(monkeypatch, tmp_path):
+    server = StandInCollector()
+    url = await server.start()
+    monkeypatch.setattr(telemetry, "ENABLED", True)
+    monkeypatch.setattr(telemetry, "PROJECT_ID", "project")
+    monkeypatch.setattr(telemetry, "AUTH_TOKEN", "token")
+    monkeypatch.setattr(telemetry, "API_URL", url)
+    monkeypatch.setattr(telemetry, "SPILL_DIR", str(tmp_path))
+    monkeypatch.setattr(telemetry, "SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(telemetry, "MODE", telemetry.MODE_EVENTS)
+    yield server
+    await server.stop()
+
+
+def track_calls(metrics, count):
+    for i in range(count):
+        metrics.track("tool_call", session_id="session", resource_name=f"tool_{i % 5}", duration_ms=i % 100)
+
+
+@pytest.mark.asyncio
+async def test_flushes_reuse_one_connection(collector):
+    metrics = telemetry.ConciergeMetrics(forward_to=None)
+    for _ in range(3):
+        track_calls(metrics, 50)
+        await metrics.flush()
+    client = metrics._client
+
+    assert len(collector.requests) == 3
+    assert collector.connections == 1
+    assert metrics.stats()["sent"] == 150
+    await metrics.stop()
+    assert client.is_closed
+    assert metrics._client is None
+
+
+@pytest.mark.asyncio
+async def test_bodies_are_compressed(collector):
+    metrics = telemetry.ConciergeMetrics(forward_to=None)
+    track_calls(metrics, 200)
+    await metrics.flush()
+    await metrics.stop()
+
+    (headers, wire, payload), = collector.requests
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    assert headers["content-encoding"] in ("gzip", "zstd")
+    assert headers["authorization"] == "Bearer token"
+    assert len(payload["events"]) == 200
+    assert len(wire) < len(raw) / 4
+
+
+def spilled_events(tmp_path) -> int:
+    return sum(len(p.read_text().splitlines()) for p in tmp_path.glob("segment-*"))
+
+
+@pytest.mark.asyncio
+async def test_server_error_spills_and_replays_after_recovery(collector, monkeypatch, tmp_path):
+    monkeypatch.setattr(telemetry, "FLUSH_INTERVAL", 0.05)
+    metrics = telemetry.ConciergeMetrics(forward_to=None)
+    collector.status = 503
+    track_calls(metrics, 20)
+    await metrics.flush()
+    # Still backing off: the next batch is spilled without another send attempt
+    track_calls(metrics, 5)
+    await metrics.flush()
+
+    assert len(collector.requests) == 1
+    assert metrics.stats()["spilled"] == 25
+    assert spilled_events(tmp_path) == 25
+
+    collector.status = 200
+    await asyncio.sleep(0.1)
+    await metrics.replay()
+    await metrics.stop()
+
+    assert metrics.stats()["replayed"] == 25
+    assert spilled_events(tmp_path) == 0
+    replayed = [e for _, _, payload in collector.requests[1:] for e in payload["events"]]
+    assert len(replayed) == 25
+
+
+@pytest.mark.asyncio
+async def test_client_error_is_rejected_not_retried(collector, tmp_path):
+    metrics = telemetry.ConciergeMetrics(forward_to=None)
+    collector.status = 400
+    track_calls(metrics, 10)
+    await metrics.flush()
+    collector.status = 200
+    track_calls(metrics, 10)
+    await metrics.flush()  # no backoff after a rejection: sent right away
+    await metrics.replay()
+    await metrics.stop()
+
+    stats = metrics.stats()
+    assert (stats["rejected"], stats["sent"], stats["spilled"], stats["replayed"]) == (10, 10, 0, 0)
+    assert len(collector.requests) == 2
+    assert spilled_events(tmp_path) == 0
+
+
+@pytest.mark.asyncio
+async def test_full_batch_wakes_the_flush_loop(collector, monkeypatch):
+    monkeypatch.setattr(telemetry, "FLUSH_INTERVAL", 60.0)
+    monkeypatch.setattr(telemetry, "FLUSH_BATCH_SIZE", 10)
+    metrics = telemetry.ConciergeMetrics(forward_to=None)
+    metrics.start()
+    await asyncio.sleep(0)  # let the loop create its wakeup event
+    track_calls(metrics, 10)
+    for _ in range(100):
+        if collector.requests:
+            break
+        await asyncio.sleep(0.01)
+    await metrics.stop()
+
+    assert len(collector.requests) == 1
+    assert len(collector.requests[0][2]["events"]) == 10
+
+
+@pytest.mark.asyncio
+async def test_spill_limit_evicts_oldest_segments(collector, monkeypatch, tmp_path):
+    monkeypatch.setattr(telemetry, "FLUSH_BATCH_SIZE", 10)
+    probe = telemetry.ConciergeMetrics(forward_to=None)
+    track_calls(probe, 1)
+    segment_bytes = 10 * (len(json.dumps(probe._drain(1)[0], separators=(",", ":"))) + 1)
+    monkeypatch.setattr(telemetry, "SPILL_MAX_BYTES", int(segment_bytes * 2.5))
+
+    metrics = telemetry.ConciergeMetrics(forward_to=None)
+    collector.status = 503
+    track_calls(metrics, 30)
+    await metrics.flush()
+
+    stats = metrics.stats()
+    assert (stats["spilled"], stats["dropped"]) == (30, 10)
+    assert len(list(tmp_path.glob("segment-*.ndjson"))) == 2
+    assert spilled_events(tmp_path) == 20
+    await metrics._client.aclose()
+
+
+def test_encode_body_without_compression():
+    payload = {"events": [{"event_type": "tool_call"}]}
+    body, headers = telemetry.encode_body(payload, compression="none")
+    assert headers == {}
+    assert json.loads(body) == payload
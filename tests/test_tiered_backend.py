@@ -0,0 +1,46 @@
+import asyncio
+from types import SimpleNamespace
+
+from benchmarks.search_bench import BenchTool
+from concierge.backends.tiered_backend import TieredBackend
+
+
+def make_backend(**options):
+    backend = TieredBackend()
+    backend.initialize(SimpleNamespace(max_results=3, model=None, search_mode="lexical", **options))
+    backend.index_tools([
+        BenchTool("tool_a", "first tool", {"type": "object", "properties": {}}),
+        BenchTool("tool_b", "second tool", {"type": "object", "properties": {}}),
+    ])
+    changes = []
+    backend.on_hot_tools_change = changes.append
+    return backend, changes
+
+
+def served(backend, name):
+    return next(t for t in backend.serve_tools() if t.name == name)
+
+
+def call_tool(backend, name):
+    return asyncio.run(served(backend, "call_tool").run({"tool_name": name, "arguments": {}}))
+
+
+def test_direct_calls_keep_a_tool_hot():
+    backend, changes = make_backend(max_hot_tools=1, promote_after=3, decay_every=20)
+    for _ in range(3):
+        call_tool(backend, "tool_a")
+    assert backend.hot_tools() == ("tool_a",)
+
+    for _ in range(240):
+        asyncio.run(served(backend, "tool_a").run({}))
+        if _ % 20 == 0:
+            call_tool(backend, "tool_b")
+
+    assert backend.hot_tools() == ("tool_a",)
+    assert changes == [("tool_a",)]
+
+
+def test_hot_tool_proxy_exposes_the_tool():
+    backend, _ = make_backend(hot_tools=("tool_b",))
+    tool = served(backend, "tool_b")
+    assert (tool.name, tool.description, tool.parameters) == ("tool_b", "second tool", {"type": "object", "properties": {}})
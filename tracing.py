@@ -0,0 +1,207 @@
+"""
+Concierge Tracing - per-call span breakdown for MCP servers
+Enabled via CONCIERGE_TRACE_FILE and/or CONCIERGE_TRACE_ENDPOINT env vars
+
+Spans are exported as OTLP/JSON: one ``{"resourceSpans": [...]}`` document
+per line in the file, or POSTed to ``<endpoint>/v1/traces``.
+"""
+import os
+import json
+import time
+import atexit
+import threading
+from collections import deque
+from contextvars import ContextVar
+from concurrent.futures import ThreadPoolExecutor
+
+TRACE_FILE = os.getenv("CONCIERGE_TRACE_FILE")
+TRACE_ENDPOINT = os.getenv("CONCIERGE_TRACE_ENDPOINT")  # OTLP/HTTP collector, e.g. http://localhost:4318
+SERVICE_NAME = os.getenv("CONCIERGE_SERVICE_NAME", os.getenv("CONCIERGE_PROJECT_ID", "concierge"))
+EXPORT_BATCH_SIZE = int(os.getenv("CONCIERGE_TRACE_BATCH_SIZE", "512"))
+FLUSH_INTERVAL_S = float(os.getenv("CONCIERGE_TRACE_FLUSH_INTERVAL", "5"))
+
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+_current: ContextVar["Span | None"] = ContextVar("concierge_span", default=None)
+
+
+class _NoopSpan:
+    """Returned by every span() call while tracing is off; one shared instance."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set_attribute(self, key, value) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    __slots__ = ("tracer", "name", "trace_id", "span_id", "parent_id", "attributes",
+                 "start_ns", "end_ns", "status", "message", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: dict):
+        parent = _current.get()
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = attributes
+        self.status = STATUS_OK
+        self.message = None
+        self.end_ns = 0
+
+    def __enter__(self):
+        self._token = _current.set(self)
+        self.start_ns = time.time_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = time.time_ns()
+        _current.reset(self._token)
+        if exc_type is not None:
+            self.status = STATUS_ERROR
+            self.message = f"{exc_type.__name__}: {exc}"
+        self.tracer._finish(self)
+        return False
+
+    def set_attribute(self, key, value) -> None:
+        self.attributes[key] = value
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": self.status, **({"message": self.message} if self.message else {})},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+def _attribute(key: str, value) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class Tracer:
+    """Collects finished spans and exports them in batches off the request path.
+
+        with tracer.span("concierge.state.load", key="cart"):
+            ...
+    """
+
+    def __init__(self, file: str | None = TRACE_FILE, endpoint: str | None = TRACE_ENDPOINT):
+        self.file = file
+        self.endpoint = endpoint.rstrip("/") if endpoint else None
+        self.enabled = bool(file or endpoint)
+        self._finished: deque[Span] = deque()
+        self._executor: ThreadPoolExecutor | None = None
+        self._drain_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._flusher: threading.Thread | None = None
+        self.exported = 0
+        self.failed = 0
+
+    def span(self, name: str, **attributes):
+        if not self.enabled:
+            return NOOP_SPAN
+        return Span(self, name, attributes)
+
+    def _finish(self, span: Span) -> None:
+        self._finished.append(span)
+        if self._flusher is None and FLUSH_INTERVAL_S > 0:
+            self._start_flusher()
+        if len(self._finished) >= EXPORT_BATCH_SIZE:
+            self.flush(wait=False)
+
+    def _start_flusher(self) -> None:
+        """Export every FLUSH_INTERVAL_S too, so quiet servers don't sit on spans until exit."""
+        with self._drain_lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(target=self._flush_periodically,
+                                             name="concierge-tracer-flush", daemon=True)
+            self._flusher.start()
+
+    def _flush_periodically(self) -> None:
+        while not self._closed.wait(FLUSH_INTERVAL_S):
+            self.flush(wait=False)
+
+    def _drain(self) -> list[Span]:
+        with self._drain_lock:
+            popleft = self._finished.popleft
+            return [popleft() for _ in range(len(self._finished))]
+
+    def flush(self, wait: bool = True) -> None:
+        spans = self._drain()
+        if not spans:
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="concierge-tracer")
+        future = self._executor.submit(self._export, spans)
+        if wait:
+            future.result()
+
+    def document(self, spans: list[Span]) -> dict:
+        return {"resourceSpans": [{
+            "resource": {"attributes": [_attribute("service.name", SERVICE_NAME)]},
+            "scopeSpans": [{
+                "scope": {"name": "concierge"},
+                "spans": [s.to_otlp() for s in spans],
+            }],
+        }]}
+
+    def _export(self, spans: list[Span]) -> None:
+        body = json.dumps(self.document(spans), separators=(",", ":"))
+        ok = True
+        if self.file:
+            try:
+                with open(self.file, "a") as f:
+                    f.write(body + "\n")
+            except OSError:
+                ok = False
+        if self.endpoint:
+            import httpx
+            try:
+                r = httpx.post(f"{self.endpoint}/v1/traces", content=body,
+                               headers={"Content-Type": "application/json"}, timeout=5.0)
+                ok = ok and r.status_code < 300
+            except Exception:
+                ok = False
+        if ok:
+            self.exported += len(spans)
+        else:
+            self.failed += len(spans)
+
+    def close(self) -> None:
+        self._closed.set()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        # Export the remainder inline: at interpreter exit the executor can no longer take work
+        spans = self._drain()
+        if spans:
+            self._export(spans)
+
+
+tracer = Tracer()
+atexit.register(tracer.close)